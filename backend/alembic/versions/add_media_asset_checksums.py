@@ -0,0 +1,45 @@
+"""
+Add checksum columns to media_assets
+
+Revision ID: add_media_asset_checksums
+Revises: add_strapi_ids
+Create Date: 2024-02-01
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_media_asset_checksums'
+down_revision = 'add_strapi_ids'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add SHA-256 and xxh3 checksum columns to media_assets"""
+
+    with op.batch_alter_table('media_assets', recreate='auto') as batch_op:
+        batch_op.add_column(sa.Column('checksum', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('weak_checksum', sa.String(length=32), nullable=True))
+
+    # 上传去重按 weak_checksum 查询，索引并发构建避免阻塞写入
+    # Uploads dedupe on weak_checksum; build its index CONCURRENTLY outside the transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_media_assets_weak_checksum', 'media_assets', ['weak_checksum'],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    """Remove checksum columns from media_assets"""
+
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_media_assets_weak_checksum', 'media_assets', postgresql_concurrently=True)
+
+    with op.batch_alter_table('media_assets', recreate='auto') as batch_op:
+        batch_op.drop_column('weak_checksum')
+        batch_op.drop_column('checksum')
@@ -0,0 +1,34 @@
+"""
+Add keyset pagination index to media_assets
+
+Revision ID: add_media_asset_keyset_index
+Revises: add_media_asset_checksums
+Create Date: 2024-02-05
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_media_asset_keyset_index'
+down_revision = 'add_media_asset_checksums'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add (created_at, id) index used by cursor pagination"""
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_media_assets_created_at_id', 'media_assets', ['created_at', 'id'],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    """Remove cursor pagination index"""
+
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_media_assets_created_at_id', 'media_assets', postgresql_concurrently=True)
@@ -0,0 +1,51 @@
+"""
+Key media_assets cursor pagination by uploader
+
+Revision ID: add_media_asset_owner_keyset_index
+Revises: add_media_asset_uploaded_by
+Create Date: 2024-02-17
+
+"""
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_media_asset_owner_keyset_index'
+down_revision = 'add_media_asset_uploaded_by'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Replace the global (created_at, id) index with (uploaded_by, created_at, id)"""
+
+    # 资源列表与搜索均按上传者过滤，每页对应一次索引范围扫描（倒序扫描满足 DESC 排序）
+    # Asset list/search always filter on the uploader, so a page is one range scan (scanned backwards for DESC)
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_media_assets_uploaded_by_created_at_id', 'media_assets',
+            ['uploaded_by', 'created_at', 'id'],
+            postgresql_concurrently=True
+        )
+        # 前导列相同，单列上传者索引与全局游标索引不再需要
+        # The composite index covers uploader lookups; the single-column and global keyset indexes are redundant
+        op.drop_index('ix_media_assets_uploaded_by', 'media_assets', postgresql_concurrently=True)
+        op.drop_index('ix_media_assets_created_at_id', 'media_assets', postgresql_concurrently=True)
+
+
+def downgrade():
+    """Restore the global keyset index and the uploader index"""
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_media_assets_created_at_id', 'media_assets', ['created_at', 'id'],
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_media_assets_uploaded_by', 'media_assets', ['uploaded_by'],
+            postgresql_concurrently=True
+        )
+        op.drop_index(
+            'ix_media_assets_uploaded_by_created_at_id', 'media_assets', postgresql_concurrently=True
+        )
@@ -0,0 +1,75 @@
+"""
+Add search indexes to media_assets
+
+Revision ID: add_media_asset_search_indexes
+Revises: add_media_asset_keyset_index
+Create Date: 2024-02-08
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_media_asset_search_indexes'
+down_revision = 'add_media_asset_keyset_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Index tags (JSONB containment) and trigram-index name/description/original filename for ILIKE search"""
+
+    # tags 改为 JSONB 以支持 @> 包含查询和 GIN 索引
+    # Convert tags to JSONB so @> containment can use a GIN index
+    op.alter_column(
+        'media_assets', 'tags',
+        type_=postgresql.JSONB(),
+        existing_type=sa.JSON(),
+        postgresql_using='tags::jsonb'
+    )
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # 中文文本没有分词，使用 pg_trgm 三元组索引支持 ILIKE '%q%' 查询
+    # Chinese text has no word boundaries for tsvector, so trigram indexes back ILIKE '%q%'
+    with op.get_context().autocommit_block():
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_media_assets_tags '
+            'ON media_assets USING GIN (tags jsonb_path_ops)'
+        )
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_media_assets_name_trgm '
+            'ON media_assets USING GIN (name gin_trgm_ops)'
+        )
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_media_assets_description_trgm '
+            "ON media_assets USING GIN ((asset_metadata ->> 'description') gin_trgm_ops)"
+        )
+        # 搜索的 OR 条件每个分支都需有索引才能使用 BitmapOr
+        # Every branch of the search OR needs an index for a BitmapOr plan
+        op.execute(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_media_assets_original_filename_trgm '
+            "ON media_assets USING GIN ((asset_metadata ->> 'original_filename') gin_trgm_ops)"
+        )
+
+
+def downgrade():
+    """Remove media_assets search indexes"""
+
+    with op.get_context().autocommit_block():
+        for index_name in (
+            'ix_media_assets_original_filename_trgm',
+            'ix_media_assets_description_trgm',
+            'ix_media_assets_name_trgm',
+            'ix_media_assets_tags',
+        ):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}')
+
+    op.alter_column(
+        'media_assets', 'tags',
+        type_=sa.JSON(),
+        existing_type=postgresql.JSONB(),
+        postgresql_using='tags::json'
+    )
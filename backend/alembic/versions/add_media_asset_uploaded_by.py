@@ -0,0 +1,47 @@
+"""
+Add uploaded_by column to media_assets
+
+Revision ID: add_media_asset_uploaded_by
+Revises: add_project_bigram_indexes
+Create Date: 2024-02-16
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_media_asset_uploaded_by'
+down_revision = 'add_project_bigram_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add the uploader reference used by asset ownership checks"""
+
+    with op.batch_alter_table('media_assets', recreate='auto') as batch_op:
+        batch_op.add_column(sa.Column('uploaded_by', sa.String(length=36), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_media_assets_uploaded_by_users', 'users', ['uploaded_by'], ['id']
+        )
+
+    # 资源列表、更新和删除均按上传者过滤，索引并发构建避免阻塞写入
+    # Asset list/update/delete filter on the uploader; build the index CONCURRENTLY
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_media_assets_uploaded_by', 'media_assets', ['uploaded_by'],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    """Remove uploaded_by from media_assets"""
+
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_media_assets_uploaded_by', 'media_assets', postgresql_concurrently=True)
+
+    with op.batch_alter_table('media_assets', recreate='auto') as batch_op:
+        batch_op.drop_constraint('fk_media_assets_uploaded_by_users', type_='foreignkey')
+        batch_op.drop_column('uploaded_by')
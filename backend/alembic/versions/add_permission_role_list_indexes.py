@@ -0,0 +1,44 @@
+"""
+Add covering indexes for permission and role listings
+
+Revision ID: add_permission_role_list_indexes
+Revises: add_user_lower_indexes
+Create Date: 2024-02-13
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_permission_role_list_indexes'
+down_revision = 'add_user_lower_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add (category, name) and (level, name) indexes used by the list endpoints"""
+
+    # 列表排序键作为索引键，过滤列放入 INCLUDE
+    # Sort keys are index keys; filter columns are carried in INCLUDE
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_permissions_category_name', 'permissions', ['category', 'name'],
+            postgresql_include=['resource', 'action', 'is_system'],
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_roles_level_name', 'roles', ['level', 'name'],
+            postgresql_include=['role_type', 'organization_id', 'is_active', 'is_system'],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    """Remove permission and role list indexes"""
+
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_roles_level_name', 'roles', postgresql_concurrently=True)
+        op.drop_index('ix_permissions_category_name', 'permissions', postgresql_concurrently=True)
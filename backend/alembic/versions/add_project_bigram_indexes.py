@@ -0,0 +1,58 @@
+"""
+Add pg_bigm indexes to projects for CJK search
+
+Revision ID: add_project_bigram_indexes
+Revises: add_project_search_indexes
+Create Date: 2024-02-15
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_project_bigram_indexes'
+down_revision = 'add_project_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+# 与三元组索引覆盖相同的列，二元组索引可支持 1-2 个汉字的查询
+# Same columns as the trigram indexes; bigrams also serve 1-2 character CJK queries
+BIGRAM_INDEXES = (
+    ('ix_projects_title_bigm', 'title'),
+    ('ix_projects_description_bigm', 'description'),
+    ('ix_projects_target_audience_bigm', "(business_input ->> 'target_audience')"),
+    ('ix_projects_key_message_bigm', "(business_input ->> 'key_message')"),
+    ('ix_projects_brand_voice_bigm', "(business_input ->> 'brand_voice')"),
+)
+
+
+def upgrade():
+    """Bigram-index project search columns when the pg_bigm extension is installed on the server"""
+
+    # pg_bigm 不随 PostgreSQL 发行，未安装时跳过（仍由 pg_trgm 索引支持搜索）
+    # pg_bigm is not bundled with PostgreSQL; skip when unavailable (pg_trgm indexes still apply)
+    available = op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_bigm'")
+    ).scalar()
+    if not available:
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_bigm')
+
+    with op.get_context().autocommit_block():
+        for index_name, expression in BIGRAM_INDEXES:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} '
+                f'ON projects USING GIN ({expression} gin_bigm_ops)'
+            )
+
+
+def downgrade():
+    """Remove project bigram indexes"""
+
+    with op.get_context().autocommit_block():
+        for index_name, _ in reversed(BIGRAM_INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}')
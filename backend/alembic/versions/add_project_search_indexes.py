@@ -0,0 +1,52 @@
+"""
+Add trigram search indexes to projects
+
+Revision ID: add_project_search_indexes
+Revises: add_permission_role_list_indexes
+Create Date: 2024-02-14
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_project_search_indexes'
+down_revision = 'add_permission_role_list_indexes'
+branch_labels = None
+depends_on = None
+
+
+# 项目列表搜索覆盖的列及业务输入字段
+# Columns and business_input fields searched by the project list
+SEARCH_INDEXES = (
+    ('ix_projects_title_trgm', 'title'),
+    ('ix_projects_description_trgm', 'description'),
+    ('ix_projects_target_audience_trgm', "(business_input ->> 'target_audience')"),
+    ('ix_projects_key_message_trgm', "(business_input ->> 'key_message')"),
+    ('ix_projects_brand_voice_trgm', "(business_input ->> 'brand_voice')"),
+)
+
+
+def upgrade():
+    """Trigram-index project title, description and business_input text for ILIKE search"""
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+
+    # gin_trgm_ops 可直接支持 ILIKE '%q%'，无需 lower() 表达式
+    # gin_trgm_ops serves ILIKE '%q%' directly, no lower() expression needed
+    with op.get_context().autocommit_block():
+        for index_name, expression in SEARCH_INDEXES:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} '
+                f'ON projects USING GIN ({expression} gin_trgm_ops)'
+            )
+
+
+def downgrade():
+    """Remove project search indexes"""
+
+    with op.get_context().autocommit_block():
+        for index_name, _ in reversed(SEARCH_INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {index_name}')
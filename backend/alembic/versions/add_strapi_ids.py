@@ -17,58 +17,44 @@
 branch_labels = None
 depends_on = None
 
+# 需要添加 strapi_id 列的表
+# Tables that receive the strapi_id column
+STRAPI_ID_TABLES = (
+    'projects',
+    'creative_ideas',
+    'scripts',
+    'storyboards',
+    'media_assets',
+    'final_videos',
+)
+
 
 def upgrade():
     """Add Strapi ID columns to existing tables"""
 
-    # Add strapi_id to projects table
-    op.add_column('projects', sa.Column('strapi_id', sa.String(length=100), nullable=True))
-    op.create_index('ix_projects_strapi_id', 'projects', ['strapi_id'])
-
-    # Add strapi_id to creative_ideas table
-    op.add_column('creative_ideas', sa.Column('strapi_id', sa.String(length=100), nullable=True))
-    op.create_index('ix_creative_ideas_strapi_id', 'creative_ideas', ['strapi_id'])
-
-    # Add strapi_id to scripts table
-    op.add_column('scripts', sa.Column('strapi_id', sa.String(length=100), nullable=True))
-    op.create_index('ix_scripts_strapi_id', 'scripts', ['strapi_id'])
-
-    # Add strapi_id to storyboards table
-    op.add_column('storyboards', sa.Column('strapi_id', sa.String(length=100), nullable=True))
-    op.create_index('ix_storyboards_strapi_id', 'storyboards', ['strapi_id'])
-
-    # Add strapi_id to media_assets table
-    op.add_column('media_assets', sa.Column('strapi_id', sa.String(length=100), nullable=True))
-    op.create_index('ix_media_assets_strapi_id', 'media_assets', ['strapi_id'])
+    # 先在同一个迁移事务中为所有表加列，只提交一次
+    # Add every column first, inside the single migration transaction (one commit)
+    for table in STRAPI_ID_TABLES:
+        with op.batch_alter_table(table, recreate='auto') as batch_op:
+            batch_op.add_column(sa.Column('strapi_id', sa.String(length=100), nullable=True))
 
-    # Add strapi_id to final_videos table
-    op.add_column('final_videos', sa.Column('strapi_id', sa.String(length=100), nullable=True))
-    op.create_index('ix_final_videos_strapi_id', 'final_videos', ['strapi_id'])
+    # 索引使用 CREATE INDEX CONCURRENTLY 构建，避免长时间锁表阻塞写入
+    # CONCURRENTLY 不能在事务中执行，因此放在 autocommit 块中
+    # Then build all indexes CONCURRENTLY (PostgreSQL) so writes are not blocked;
+    # this cannot run inside a transaction, hence the autocommit block
+    with op.get_context().autocommit_block():
+        for table in STRAPI_ID_TABLES:
+            op.create_index(f'ix_{table}_strapi_id', table, ['strapi_id'], postgresql_concurrently=True)
 
 
 def downgrade():
     """Remove Strapi ID columns from tables"""
 
-    # Remove strapi_id from final_videos table
-    op.drop_index('ix_final_videos_strapi_id', 'final_videos')
-    op.drop_column('final_videos', 'strapi_id')
-
-    # Remove strapi_id from media_assets table
-    op.drop_index('ix_media_assets_strapi_id', 'media_assets')
-    op.drop_column('media_assets', 'strapi_id')
-
-    # Remove strapi_id from storyboards table
-    op.drop_index('ix_storyboards_strapi_id', 'storyboards')
-    op.drop_column('storyboards', 'strapi_id')
-
-    # Remove strapi_id from scripts table
-    op.drop_index('ix_scripts_strapi_id', 'scripts')
-    op.drop_column('scripts', 'strapi_id')
-
-    # Remove strapi_id from creative_ideas table
-    op.drop_index('ix_creative_ideas_strapi_id', 'creative_ideas')
-    op.drop_column('creative_ideas', 'strapi_id')
+    # Drop indexes CONCURRENTLY outside the migration transaction
+    with op.get_context().autocommit_block():
+        for table in reversed(STRAPI_ID_TABLES):
+            op.drop_index(f'ix_{table}_strapi_id', table, postgresql_concurrently=True)
 
-    # Remove strapi_id from projects table
-    op.drop_index('ix_projects_strapi_id', 'projects')
-    op.drop_column('projects', 'strapi_id')
\ No newline at end of file
+    for table in reversed(STRAPI_ID_TABLES):
+        with op.batch_alter_table(table, recreate='auto') as batch_op:
+            batch_op.drop_column('strapi_id')
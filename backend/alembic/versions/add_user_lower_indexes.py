@@ -0,0 +1,42 @@
+"""
+Add case-insensitive unique indexes to users
+
+Revision ID: add_user_lower_indexes
+Revises: add_media_asset_search_indexes
+Create Date: 2024-02-12
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'add_user_lower_indexes'
+down_revision = 'add_media_asset_search_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    """Add unique lower(email) / lower(username) indexes used by login and register"""
+
+    # 邮箱和用户名按不区分大小写的方式查找和去重
+    # Email and username are looked up and kept unique case-insensitively
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_users_email_lower', 'users', [sa.text('lower(email)')],
+            unique=True, postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_users_username_lower', 'users', [sa.text('lower(username)')],
+            unique=True, postgresql_concurrently=True
+        )
+
+
+def downgrade():
+    """Remove case-insensitive user indexes"""
+
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_username_lower', 'users', postgresql_concurrently=True)
+        op.drop_index('ix_users_email_lower', 'users', postgresql_concurrently=True)
@@ -6,48 +6,57 @@
 Integrates DeepSeek and 即梦大模型 for content creation
 """
 
+import asyncio
+import hashlib
 import logging
-from fastapi import APIRouter, Depends, HTTPException, status
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional
-from uuid import uuid4
 
-from app.services.deepseek_service import deepseek_service
-from app.services.jimeng_service import jimeng_service
+from app.core.exceptions import AIServiceError
 from app.services.autogen_orchestrator import (
     autogen_orchestrator, TaskType, TaskStatus
 )
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(prefix="/ai", tags=["AI内容生成"], default_response_class=ORJSONResponse)
 
 # AI生成请求模型
 class GenerateConceptRequest(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     project_id: str
-    prompt: str = Field(..., description="生成提示词 (中文)", example="为母婴护肤品牌创作温馨的广告创意")
-    cultural_context: str = Field(..., description="文化背景 (中文)", example="中国年轻妈妈注重宝宝健康和安全")
-    platform_target: str = Field(..., description="目标平台", example="douyin")
+    prompt: str = Field(..., description="生成提示词 (中文)", examples=["为母婴护肤品牌创作温馨的广告创意"])
+    cultural_context: str = Field(..., description="文化背景 (中文)", examples=["中国年轻妈妈注重宝宝健康和安全"])
+    platform_target: str = Field(..., description="目标平台", examples=["douyin"])
     ai_model: str = Field(default="deepseek-chat", description="AI模型选择")
     temperature: float = Field(default=0.7, ge=0.0, le=2.0, description="生成温度")
     max_tokens: int = Field(default=1000, ge=100, le=4000, description="最大token数")
 
 class GenerateScriptRequest(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     project_id: str
     concept_id: str
     tone: str = Field(default="casual", description="语调风格")
-    target_age_group: str = Field(..., description="目标年龄群体 (中文)", example="25-35岁年轻妈妈")
+    target_age_group: str = Field(..., description="目标年龄群体 (中文)", examples=["25-35岁年轻妈妈"])
     cultural_references: List[str] = Field(default_factory=list, description="文化引用 (中文)")
     ai_model: str = Field(default="deepseek-chat", description="AI模型选择")
 
 class GenerateStoryboardRequest(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     project_id: str
     script_scene_ids: List[str] = Field(..., description="关联的剧本场景ID列表")
     resolution: str = Field(default="1024x1024", description="图像分辨率")
-    style: str = Field(..., description="视觉风格 (中文)", example="现代简约，温馨家庭风格")
+    style: str = Field(..., description="视觉风格 (中文)", examples=["现代简约，温馨家庭风格"])
     color_palette: List[str] = Field(default_factory=list, description="色彩调色板")
     ai_model: str = Field(default="jimeng-4.0", description="即梦大模型版本")
 
 class GenerateVideoRequest(BaseModel):
+    model_config = ConfigDict(extra='ignore', frozen=True)
+
     project_id: str
     storyboard_ids: List[str] = Field(..., description="关联的分镜ID列表")
     duration: int = Field(default=6, ge=5, le=30, description="视频时长 (秒)")
@@ -55,207 +64,207 @@ class GenerateVideoRequest(BaseModel):
     frame_rate: int = Field(default=24, description="帧率")
     ai_model: str = Field(default="jimeng-video-3.0", description="即梦视频模型")
 
-@router.post("/generate/concept")
-async def generate_concept(request: GenerateConceptRequest):
-    """生成创意概念 - 使用DeepSeek"""
-    try:
-        # 使用AutoGen编排器创建任务
-        task_id = await autogen_orchestrator.create_task(
-            task_type=TaskType.CONCEPT_GENERATION,
-            project_id=request.project_id,
-            parameters={
-                "prompt": request.prompt,
-                "cultural_context": request.cultural_context,
-                "platform_target": request.platform_target,
-                "temperature": request.temperature,
-                "max_tokens": request.max_tokens
-            }
-        )
-
-        logger.info(f"🚀 创意概念生成任务已创建 - TaskID: {task_id}")
-
-        return {
-            "message": "创意概念生成任务已启动",
-            "task_id": task_id,
-            "status": "pending",
-            "project_id": request.project_id
-        }
+# 各生成端点对应的任务类型
+_TT_CONCEPT = TaskType.CONCEPT_GENERATION
+_TT_SCRIPT = TaskType.SCRIPT_WRITING
+_TT_STORYBOARD = TaskType.STORYBOARD_CREATION
+_TT_VIDEO = TaskType.VIDEO_GENERATION
+
+# 转发给编排器的任务参数字段
+_CONCEPT_PARAM_FIELDS = frozenset({"prompt", "cultural_context", "platform_target", "temperature", "max_tokens"})
+_SCRIPT_PARAM_FIELDS = frozenset({"tone", "target_age_group", "cultural_references", "ai_model"})
+_STORYBOARD_PARAM_FIELDS = frozenset({"script_scene_ids", "resolution", "style", "color_palette", "ai_model"})
+_VIDEO_PARAM_FIELDS = frozenset({"storyboard_ids", "duration", "resolution", "frame_rate", "ai_model"})
+
+# 任务创建时可预期的异常；其余异常（含CancelledError）交由全局异常处理器
+_TASK_CREATION_ERRORS = (AIServiceError, ValueError, asyncio.TimeoutError)
+
+# 终态任务的状态不再变化，可被客户端长期缓存
+_TERMINAL_STATUSES = frozenset({
+    TaskStatus.COMPLETED.value, TaskStatus.FAILED.value, TaskStatus.CANCELLED.value
+})
+
+class BulkTaskStatusRequest(BaseModel):
+    task_ids: List[str] = Field(..., min_length=1, max_length=100, description="任务ID列表")
+
+class BatchStoryboardRequest(BaseModel):
+    requests: List[GenerateStoryboardRequest] = Field(..., min_length=1, max_length=100, description="分镜生成请求列表")
+
+def _make_generate_handler(task_name, request_model, task_type, param_fields, name, doc, extra_params=None):
+    """按任务类型生成内容生成端点，四个生成端点共用同一流程"""
+    async def handler(request: request_model):
+        try:
+            parameters = request.model_dump(include=param_fields)
+            if extra_params:
+                parameters.update(extra_params(request))
+
+            # 使用AutoGen编排器创建任务
+            task_id = await autogen_orchestrator.create_task(
+                task_type=task_type,
+                project_id=request.project_id,
+                parameters=parameters
+            )
 
-    except Exception as e:
-        logger.error(f"❌ 创意概念生成任务创建失败: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"创意概念生成任务创建失败: {str(e)}"
-        )
+            logger.info("🚀 %s任务已创建 - TaskID: %s", name, task_id)
 
-@router.post("/generate/script")
-async def generate_script(request: GenerateScriptRequest):
-    """生成剧本 - 使用DeepSeek"""
-    try:
-        # 使用AutoGen编排器创建任务
-        task_id = await autogen_orchestrator.create_task(
-            task_type=TaskType.SCRIPT_WRITING,
-            project_id=request.project_id,
-            parameters={
-                "concept": request.concept_id,  # 这里应该获取实际的创意概念内容
-                "tone": request.tone,
-                "target_age_group": request.target_age_group,
-                "cultural_references": request.cultural_references,
-                "ai_model": request.ai_model
+            return {
+                "message": f"{name}任务已启动",
+                "task_id": task_id,
+                "status": "pending",
+                "project_id": request.project_id
             }
-        )
 
-        logger.info(f"🚀 剧本生成任务已创建 - TaskID: {task_id}")
+        except _TASK_CREATION_ERRORS as e:
+            logger.error("❌ %s任务创建失败: %s", name, e)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"{name}任务创建失败: {str(e)}"
+            )
 
-        return {
-            "message": "剧本生成任务已启动",
-            "task_id": task_id,
-            "status": "pending",
-            "project_id": request.project_id
-        }
+    handler.__name__ = f"generate_{task_name}"
+    handler.__doc__ = doc
+    return handler
 
-    except Exception as e:
-        logger.error(f"❌ 剧本生成任务创建失败: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"剧本生成任务创建失败: {str(e)}"
-        )
+generate_concept = _make_generate_handler(
+    "concept", GenerateConceptRequest, _TT_CONCEPT, _CONCEPT_PARAM_FIELDS,
+    "创意概念生成", "生成创意概念 - 使用DeepSeek"
+)
+generate_script = _make_generate_handler(
+    "script", GenerateScriptRequest, _TT_SCRIPT, _SCRIPT_PARAM_FIELDS,
+    "剧本生成", "生成剧本 - 使用DeepSeek",
+    # 这里应该获取实际的创意概念内容
+    extra_params=lambda request: {"concept": request.concept_id}
+)
+generate_storyboard = _make_generate_handler(
+    "storyboard", GenerateStoryboardRequest, _TT_STORYBOARD, _STORYBOARD_PARAM_FIELDS,
+    "分镜图像生成", "生成分镜图像 - 使用即梦大模型"
+)
+generate_video = _make_generate_handler(
+    "video", GenerateVideoRequest, _TT_VIDEO, _VIDEO_PARAM_FIELDS,
+    "视频生成", "生成视频 - 使用即梦大模型"
+)
 
-@router.post("/generate/storyboard")
-async def generate_storyboard(request: GenerateStoryboardRequest):
-    """生成分镜图像 - 使用即梦大模型"""
-    try:
-        # 使用AutoGen编排器创建任务
-        task_id = await autogen_orchestrator.create_task(
-            task_type=TaskType.STORYBOARD_CREATION,
-            project_id=request.project_id,
-            parameters={
-                "script_scene_ids": request.script_scene_ids,
-                "resolution": request.resolution,
-                "style": request.style,
-                "color_palette": request.color_palette,
-                "ai_model": request.ai_model
-            }
+router.add_api_route("/generate/concept", generate_concept, methods=["POST"])
+router.add_api_route("/generate/script", generate_script, methods=["POST"])
+router.add_api_route("/generate/storyboard", generate_storyboard, methods=["POST"])
+router.add_api_route("/generate/video", generate_video, methods=["POST"])
+
+@router.post("/generate/storyboard:batch")
+async def generate_storyboard_batch(request: BatchStoryboardRequest):
+    """批量生成分镜图像 - 一次请求并发创建多个任务，逐项返回创建结果"""
+    # 单项失败不影响其他已创建的任务，失败项在结果中标记
+    results = await asyncio.gather(*[
+        autogen_orchestrator.create_task(
+            task_type=_TT_STORYBOARD,
+            project_id=r.project_id,
+            parameters=r.model_dump(include=_STORYBOARD_PARAM_FIELDS)
         )
-
-        logger.info(f"🚀 分镜图像生成任务已创建 - TaskID: {task_id}")
-
-        return {
-            "message": "分镜图像生成任务已启动",
-            "task_id": task_id,
-            "status": "pending",
-            "project_id": request.project_id
-        }
-
-    except Exception as e:
-        logger.error(f"❌ 分镜图像生成任务创建失败: {str(e)}")
+        for r in request.requests
+    ], return_exceptions=True)
+
+    tasks = []
+    for result, r in zip(results, request.requests):
+        if isinstance(result, _TASK_CREATION_ERRORS):
+            logger.error("❌ 分镜图像生成任务创建失败 - 项目: %s, 错误: %s", r.project_id, result)
+            tasks.append({"task_id": None, "status": "failed", "project_id": r.project_id, "error": str(result)})
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            tasks.append({"task_id": result, "status": "pending", "project_id": r.project_id})
+
+    created = sum(1 for task in tasks if task["task_id"] is not None)
+    if not created:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"分镜图像生成任务创建失败: {str(e)}"
+            detail=f"批量分镜图像生成任务创建失败: {tasks[0]['error']}"
         )
 
-@router.post("/generate/video")
-async def generate_video(request: GenerateVideoRequest):
-    """生成视频 - 使用即梦大模型"""
-    try:
-        # 使用AutoGen编排器创建任务
-        task_id = await autogen_orchestrator.create_task(
-            task_type=TaskType.VIDEO_GENERATION,
-            project_id=request.project_id,
-            parameters={
-                "storyboard_ids": request.storyboard_ids,
-                "duration": request.duration,
-                "resolution": request.resolution,
-                "frame_rate": request.frame_rate,
-                "ai_model": request.ai_model
-            }
-        )
+    logger.info("🚀 批量分镜图像生成任务已创建 - 数量: %d/%d", created, len(tasks))
 
-        logger.info(f"🚀 视频生成任务已创建 - TaskID: {task_id}")
+    return {
+        "message": "批量分镜图像生成任务已启动",
+        "tasks": tasks
+    }
 
-        return {
-            "message": "视频生成任务已启动",
-            "task_id": task_id,
-            "status": "pending",
-            "project_id": request.project_id
-        }
+@router.get("/tasks/{task_id}/status")
+async def get_generation_status(task_id: str, request: Request, response: Response):
+    """获取AI生成任务状态 - 支持ETag条件请求"""
+    # 从AutoGen编排器获取任务状态
+    task_status = autogen_orchestrator.get_task_status(task_id)
 
-    except Exception as e:
-        logger.error(f"❌ 视频生成任务创建失败: {str(e)}")
+    if not task_status:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"视频生成任务创建失败: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"未找到任务: {task_id}"
         )
 
-@router.get("/tasks/{task_id}/status")
-async def get_generation_status(task_id: str):
-    """获取AI生成任务状态"""
-    try:
-        # 从AutoGen编排器获取任务状态
-        task_status = autogen_orchestrator.get_task_status(task_id)
+    # 状态与完成时间不变则响应内容不变
+    etag = '"%s"' % hashlib.blake2b(
+        f"{task_id}:{task_status['status']}:{task_status['completed_at']}".encode(),
+        digest_size=8
+    ).hexdigest()
+    headers = {"ETag": etag}
+    if task_status["status"] in _TERMINAL_STATUSES:
+        headers["Cache-Control"] = "public, max-age=86400"
 
-        if not task_status:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"未找到任务: {task_id}"
-            )
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-        return task_status
+    response.headers.update(headers)
+    return task_status
 
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"❌ 获取任务状态失败: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"获取任务状态失败: {str(e)}"
-        )
+@router.post("/tasks/status:bulk")
+async def get_generation_statuses(request: BulkTaskStatusRequest):
+    """批量获取AI生成任务状态 - 一次请求替代N次轮询"""
+    statuses = autogen_orchestrator.get_task_statuses(request.task_ids)
+
+    return {
+        "tasks": {task_id: s for task_id, s in statuses.items() if s is not None},
+        "not_found": [task_id for task_id, s in statuses.items() if s is None]
+    }
 
 @router.get("/tasks")
-async def get_all_tasks():
+async def get_all_tasks(
+    project_id: Optional[str] = Query(None, description="按项目筛选"),
+    task_status: Optional[TaskStatus] = Query(None, alias="status", description="按状态筛选"),
+    summary: bool = Query(False, description="仅返回任务数量"),
+    limit: Optional[int] = Query(None, ge=1, le=500, description="每页数量"),
+    offset: int = Query(0, ge=0, description="偏移量")
+):
     """获取所有AI生成任务"""
-    try:
-        # 获取所有活跃任务
-        tasks = autogen_orchestrator.get_active_tasks()
+    status_value = task_status.value if task_status else None
+    total_count = autogen_orchestrator.count_active_tasks(project_id=project_id, status=status_value)
 
-        return {
-            "tasks": tasks,
-            "total_count": len(tasks)
-        }
+    # 仅需数量时不构建任务列表
+    if summary:
+        return {"total_count": total_count}
 
-    except Exception as e:
-        logger.error(f"❌ 获取任务列表失败: {str(e)}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"获取任务列表失败: {str(e)}"
-        )
+    # 获取活跃任务（服务端分页）
+    tasks = autogen_orchestrator.get_active_tasks(
+        limit=limit, offset=offset, project_id=project_id, status=status_value
+    )
+
+    return {
+        "tasks": tasks,
+        "total_count": total_count
+    }
 
 @router.delete("/tasks/{task_id}")
 async def cancel_task(task_id: str):
     """取消AI生成任务"""
-    try:
-        # 尝试取消任务
-        success = await autogen_orchestrator.cancel_task(task_id)
+    # 尝试取消任务
+    success = await autogen_orchestrator.cancel_task(task_id)
 
-        if not success:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"无法取消任务: {task_id}"
-            )
-
-        return {
-            "message": "任务已取消",
-            "task_id": task_id,
-            "status": "cancelled"
-        }
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"❌ 取消任务失败: {str(e)}")
+    if not success:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"取消任务失败: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"无法取消任务: {task_id}"
         )
 
+    return {
+        "message": "任务已取消",
+        "task_id": task_id,
+        "status": "cancelled"
+    }
+
 logger.info("✅ AI内容生成API端点配置完成 - 集成DeepSeek和即梦大模型")
\ No newline at end of file
@@ -6,36 +6,50 @@
 Handles file uploads, storage, media asset management, and Alibaba Cloud OSS integration
 """
 
+import asyncio
 import logging
 import os
 import hashlib
-import mimetypes
+import tempfile
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from uuid import uuid4
-from pathlib import Path
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, status
-from pydantic import BaseModel, Field, validator
+import aiofiles
+import orjson
+import xxhash
+from streaming_form_data import StreamingFormDataParser
+from streaming_form_data.targets import BaseTarget, ValueTarget
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, Query, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from pydantic import AliasChoices, BaseModel, ConfigDict, Field, TypeAdapter, validator
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, insert, update, delete
+from sqlalchemy import select, insert, update, delete, tuple_
 
-from app.core.database import get_db, MediaAsset
+from app.core import database
+from app.core.database import get_db, redis_manager, MediaAsset
 from app.core.security import get_current_user
 from app.models import User
 from app.core.exceptions import ValidationError, NotFoundError
 from app.core.config import settings
-from app.services.file_storage import FileStorageService
+from app.services.file_storage import FileStorageService, analyze_image, probe_image_specs
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
 
 # 文件存储服务实例
 file_storage = FileStorageService()
 
+# 资源类型（保持顺序用于错误提示）
+VALID_ASSET_TYPES = ("image", "video", "audio", "document")
+
 # 媒体资源模型定义
 class AssetUploadResponse(BaseModel):
     """资源上传响应模型"""
+    model_config = ConfigDict(frozen=True)
+
     asset_id: str
     filename: str
     original_filename: str
@@ -46,33 +60,40 @@ class AssetUploadResponse(BaseModel):
     thumbnail_url: Optional[str]
     upload_status: str
     checksum: str
-    uploaded_at: str
+    uploaded_at: datetime
 
 class AssetResponse(BaseModel):
     """资源详情响应模型"""
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
     id: str
     name: str
     original_filename: str
     type: str
     mime_type: str
-    url: str
+    # ORM列名与响应字段不同（metadata与Base.metadata冲突）
+    url: str = Field(validation_alias=AliasChoices("file_url", "url"))
     thumbnail_url: Optional[str]
     file_size: int
     checksum: str
     technical_specs: Dict[str, Any]
-    metadata: Dict[str, Any]
+    metadata: Dict[str, Any] = Field(validation_alias=AliasChoices("asset_metadata", "metadata"))
     project_id: Optional[str]
     uploaded_by: str
     created_at: datetime
     updated_at: datetime
 
+# 列表响应一次性批量校验ORM对象
+_asset_list_adapter = TypeAdapter(List[AssetResponse])
+
 class AssetListResponse(BaseModel):
-    """资源列表响应模型"""
+    """资源列表响应模型（游标分页）"""
+    model_config = ConfigDict(frozen=True)
+
     assets: List[AssetResponse]
-    total: int
-    page: int
     limit: int
-    total_pages: int
+    has_more: bool
+    next_cursor: Optional[str] = None
 
 class AssetUploadRequest(BaseModel):
     """资源上传请求模型"""
@@ -85,9 +106,8 @@ class AssetUploadRequest(BaseModel):
 
     @validator('type')
     def validate_type(cls, v):
-        valid_types = ["image", "video", "audio", "document"]
-        if v not in valid_types:
-            raise ValueError(f'资源类型必须是以下之一: {", ".join(valid_types)}')
+        if v not in VALID_ASSET_TYPES:
+            raise ValueError(f'资源类型必须是以下之一: {", ".join(VALID_ASSET_TYPES)}')
         return v
 
     @validator('name')
@@ -112,6 +132,8 @@ class AssetSearchRequest(BaseModel):
     uploaded_by: Optional[str] = Field(None, description="上传者过滤")
     date_from: Optional[datetime] = Field(None, description="开始日期")
     date_to: Optional[datetime] = Field(None, description="结束日期")
+    cursor: Optional[str] = Field(None, description="分页游标（上一页返回的next_cursor）")
+    limit: int = Field(50, ge=1, le=100, description="每页数量")
 
 # 文件验证常量
 MAX_FILE_SIZES = {
@@ -122,125 +144,208 @@ class AssetSearchRequest(BaseModel):
 }
 
 ALLOWED_MIME_TYPES = {
-    "image": ["image/jpeg", "image/png", "image/webp", "image/gif", "image/bmp", "image/tiff"],
-    "video": ["video/mp4", "video/webm", "video/quicktime", "video/x-msvideo", "video/mpeg"],
-    "audio": ["audio/mp3", "audio/wav", "audio/aac", "audio/m4a", "audio/ogg", "audio/flac"],
-    "document": ["application/pdf", "application/msword", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]
+    "image": frozenset({"image/jpeg", "image/png", "image/webp", "image/gif", "image/bmp", "image/tiff"}),
+    "video": frozenset({"video/mp4", "video/webm", "video/quicktime", "video/x-msvideo", "video/mpeg"}),
+    "audio": frozenset({"audio/mp3", "audio/wav", "audio/aac", "audio/m4a", "audio/ogg", "audio/flac"}),
+    "document": frozenset({"application/pdf", "application/msword", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"})
+}
+
+ALLOWED_EXTENSIONS = {
+    "image": frozenset({".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tiff"}),
+    "video": frozenset({".mp4", ".webm", ".mov", ".avi", ".mpeg"}),
+    "audio": frozenset({".mp3", ".wav", ".aac", ".m4a", ".ogg", ".flac"}),
+    "document": frozenset({".pdf", ".doc", ".docx"})
+}
+
+# 上传表单的文本字段
+UPLOAD_FORM_FIELDS = ("name", "type", "project_id", "description", "tags", "generate_thumbnail")
+
+# 上传接口的OpenAPI请求体描述（请求体由流式解析器处理，不经过FastAPI表单参数）
+UPLOAD_FORM_SCHEMA = {
+    "type": "object",
+    "required": ["file", "name", "type"],
+    "properties": {
+        "file": {"type": "string", "format": "binary"},
+        "name": {"type": "string"},
+        "type": {"type": "string", "enum": list(VALID_ASSET_TYPES)},
+        "project_id": {"type": "string"},
+        "description": {"type": "string"},
+        "tags": {"type": "string", "description": "逗号分隔的标签"},
+        "generate_thumbnail": {"type": "boolean", "default": True}
+    }
 }
 
+# 文件数据累积到该大小后再统一写入和计算哈希
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+# Redis中上传去重登记的有效期
+DEDUP_CACHE_TTL = 24 * 60 * 60  # 24小时
+# 去重指纹采样文件首尾各1MB
+FINGERPRINT_SAMPLE_SIZE = 1024 * 1024
+# 超过该大小的数据块在线程中计算哈希
+HASH_OFFLOAD_THRESHOLD = 256 * 1024  # 256KB
+# 列表/搜索的流式响应格式（请求头Accept包含该类型时启用）
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+# 流式响应时每批从数据库游标读取的行数
+STREAM_YIELD_PER = 100
+
 # API端点实现
 
-@router.post("/upload", response_model=AssetUploadResponse)
+@router.post(
+    "/upload",
+    response_model=AssetUploadResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"multipart/form-data": {"schema": UPLOAD_FORM_SCHEMA}}
+        }
+    }
+)
 async def upload_asset(
-    file: UploadFile = File(...),
-    name: str = Form(...),
-    type: str = Form(...),
-    project_id: Optional[str] = Form(None),
-    description: Optional[str] = Form(None),
-    tags: Optional[str] = Form(None),
-    generate_thumbnail: bool = Form(True),
+    request: Request,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     上传媒体资源文件
 
-    支持图片、视频、音频和文档文件上传，自动进行文件类型验证和大小限制检查
+    支持图片、视频、音频和文档文件上传，自动进行文件类型验证和大小限制检查。
+    multipart请求体由流式解析器边接收边处理，不经过Starlette的表单缓冲
     """
+    reserved_checksum = None
     try:
-        # 验证文件
-        _validate_upload_file(file, type)
-
-        # 解析标签
-        tag_list = []
-        if tags:
-            tag_list = [tag.strip() for tag in tags.split(",") if tag.strip()]
-
-        # 读取文件内容并计算校验和
-        file_content = await file.read()
-        file_size = len(file_content)
-        checksum = hashlib.sha256(file_content).hexdigest()
-
-        # 检查文件是否已存在（通过校验和）
-        existing_asset = await db.execute(
-            select(MediaAsset).where(MediaAsset.checksum == checksum)
-        )
-        if existing_asset.scalar_one_or_none():
-            raise ValidationError(
-                "文件已存在（校验和匹配）",
-                details={"checksum": checksum}
+        # 边解析multipart请求体边写入临时文件并增量计算校验和，避免整个文件驻留内存
+        fd, tmp_path = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            form, file, file_size, checksum = await _stream_multipart_upload(request, tmp_path)
+
+            name, type = form["name"].strip(), form["type"]
+            project_id = form.get("project_id")
+            description = form.get("description")
+            tags = form.get("tags")
+            generate_thumbnail = form.get("generate_thumbnail", "true").lower() in ("true", "1", "on", "yes")
+
+            # 验证文件
+            file_extension = _validate_upload_file(file.multipart_filename, file.multipart_content_type, type)
+
+            # 解析标签
+            tag_list = []
+            if tags:
+                tag_list = [tag.strip() for tag in tags.split(",") if tag.strip()]
+
+            # 在Redis中登记校验和（SET NX）：登记成功说明近期未见过该文件，跳过数据库查询；
+            # 已有登记或Redis不可用时以数据库为准。只有登记成功的请求负责撤销登记
+            reserved = await _reserve_checksum(checksum)
+            if reserved:
+                reserved_checksum = checksum
+
+            # 大小+首尾采样指纹随记录写入，供后续去重预筛
+            weak_checksum = await _sampled_fingerprint(tmp_path, file_size)
+            if not reserved:
+                # 检查文件是否已存在（先按索引的大小+首尾采样指纹预筛，再以完整SHA-256确认）
+                existing_asset = await db.execute(
+                    select(MediaAsset.checksum).where(MediaAsset.weak_checksum == weak_checksum)
+                )
+                if checksum in existing_asset.scalars().all():
+                    raise ValidationError(
+                        "文件已存在（校验和匹配）",
+                        details={"checksum": checksum}
+                    )
+
+            # 生成文件存储路径
+            asset_id = str(uuid4())
+            storage_path = f"assets/{current_user.id}/{asset_id}{file_extension}"
+
+            # 上传文件到存储服务
+            upload_coro = file_storage.upload_file_from_path(
+                source_path=tmp_path,
+                file_path=storage_path,
+                content_type=file.multipart_content_type
             )
 
-        # 生成文件存储路径
-        file_extension = Path(file.filename).suffix.lower()
-        asset_id = str(uuid4())
-        storage_path = f"assets/{current_user.id}/{asset_id}{file_extension}"
-
-        # 上传文件到存储服务
-        upload_result = await file_storage.upload_file(
-            file_content=file_content,
-            file_path=storage_path,
-            content_type=file.content_type
-        )
-
-        # 生成缩略图（如果是图片且需要生成）
+            image_specs, thumbnail_content = {}, None
+            if type == "image" and generate_thumbnail:
+                # 图片体积受限（10MB），读入内存后在进程池中解码，与存储上传并行
+                async with aiofiles.open(tmp_path, 'rb') as f:
+                    file_content = await f.read()
+                upload_result, (image_specs, thumbnail_content) = await asyncio.gather(
+                    upload_coro,
+                    _analyze_image(request.app.state.media_process_pool, file_content, generate_thumbnail)
+                )
+            else:
+                if type == "image":
+                    # 不生成缩略图时只需尺寸，解析文件头即可
+                    image_specs = _probe_image_specs(tmp_path, file.multipart_content_type)
+                upload_result = await upload_coro
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(tmp_path)
+
+        # 上传缩略图（如果已生成）
         thumbnail_url = None
-        if type == "image" and generate_thumbnail:
+        if thumbnail_content:
             try:
-                thumbnail_path = f"thumbnails/{current_user.id}/{asset_id}.jpg"
-                thumbnail_result = await file_storage.generate_thumbnail(
-                    file_content=file_content,
-                    thumbnail_path=thumbnail_path,
-                    size=(300, 300)
+                thumbnail_result = await file_storage.upload_file(
+                    file_content=thumbnail_content,
+                    file_path=f"thumbnails/{current_user.id}/{asset_id}.jpg",
+                    content_type="image/jpeg"
                 )
                 thumbnail_url = thumbnail_result["url"]
             except Exception as e:
                 logger.warning(f"生成缩略图失败: {str(e)}")
 
         # 提取技术规格
-        technical_specs = await _extract_technical_specs(file_content, type, file.content_type)
-
-        # 创建媒体资源记录
-        new_asset = MediaAsset(
-            id=asset_id,
-            name=name,
-            original_filename=file.filename,
-            type=type,
-            mime_type=file.content_type,
-            file_size=file_size,
-            url=upload_result["url"],
-            thumbnail_url=thumbnail_url,
-            checksum=checksum,
-            technical_specs=technical_specs,
-            metadata={
-                "description": description,
-                "tags": tag_list,
-                "upload_original_name": file.filename
-            },
-            project_id=project_id,
-            uploaded_by=current_user.id,
-            created_at=datetime.utcnow(),
-            updated_at=datetime.utcnow()
+        technical_specs = _extract_technical_specs(
+            type, file.multipart_content_type, image_specs,
+            checksum=checksum, file_size=file_size
         )
 
-        db.add(new_asset)
+        # 创建媒体资源记录（INSERT ... RETURNING，无需提交后再refresh）
+        now = datetime.utcnow()
+        result = await db.execute(
+            insert(MediaAsset).
+            values(
+                id=asset_id,
+                name=name,
+                type=type,
+                mime_type=file.multipart_content_type,
+                file_size=file_size,
+                file_url=upload_result["url"],
+                checksum=checksum,
+                weak_checksum=weak_checksum,
+                # 原始文件名、缩略图和技术规格没有独立列，存入元数据
+                asset_metadata={
+                    "description": description,
+                    "original_filename": file.multipart_filename,
+                    "thumbnail_url": thumbnail_url,
+                    "technical_specs": technical_specs
+                },
+                tags=tag_list,
+                project_id=project_id,
+                uploaded_by=current_user.id,
+                created_at=now,
+                updated_at=now
+            ).
+            returning(MediaAsset.created_at)
+        )
+        uploaded_at = result.scalar_one()
         await db.commit()
-        await db.refresh(new_asset)
+        reserved_checksum = None
 
-        logger.info(f"✅ 媒体资源上传成功: {name} ({file.filename}) - 用户: {current_user.username}")
+        logger.info(f"✅ 媒体资源上传成功: {name} ({file.multipart_filename}) - 用户: {current_user.username}")
 
         return AssetUploadResponse(
             asset_id=asset_id,
             filename=name,
-            original_filename=file.filename,
+            original_filename=file.multipart_filename,
             file_size=file_size,
             file_type=type,
-            mime_type=file.content_type,
+            mime_type=file.multipart_content_type,
             url=upload_result["url"],
             thumbnail_url=thumbnail_url,
             upload_status="completed",
             checksum=checksum,
-            uploaded_at=datetime.utcnow().isoformat()
+            uploaded_at=uploaded_at
         )
 
     except ValidationError:
@@ -251,20 +356,26 @@ async def upload_asset(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="媒体资源上传失败"
         )
+    finally:
+        # 上传未完成时撤销Redis登记，允许重新上传
+        if reserved_checksum:
+            await _release_checksum(reserved_checksum)
 
 @router.get("/", response_model=AssetListResponse)
 async def get_assets(
+    request: Request,
     type: Optional[str] = None,
     project_id: Optional[str] = None,
-    page: int = 1,
-    limit: int = 20,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
     获取媒体资源列表
 
-    支持按类型、项目ID过滤，支持分页
+    支持按类型、项目ID过滤，按 (created_at, id) 游标分页；
+    请求头Accept为application/x-ndjson时逐行流式返回
     """
     try:
         # 基础查询
@@ -276,53 +387,30 @@ async def get_assets(
         if project_id:
             query = query.where(MediaAsset.project_id == project_id)
 
-        # 排序（按创建时间倒序）
-        query = query.order_by(MediaAsset.created_at.desc())
+        # 游标分页（按创建时间倒序）
+        query = _apply_cursor(query, cursor, limit)
 
-        # 分页
-        from sqlalchemy import func
-        total_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(total_query)
-        total = total_result.scalar()
-
-        offset = (page - 1) * limit
-        query = query.offset(offset).limit(limit)
+        if _accepts_ndjson(request):
+            return StreamingResponse(_stream_assets_ndjson(query, limit), media_type=NDJSON_MEDIA_TYPE)
 
         # 执行查询
         result = await db.execute(query)
-        assets = result.scalars().all()
+        assets, has_more, next_cursor = _split_page(result.scalars().all(), limit)
 
         # 转换为响应模型
-        asset_responses = []
-        for asset in assets:
-            asset_responses.append(AssetResponse(
-                id=asset.id,
-                name=asset.name,
-                original_filename=asset.original_filename,
-                type=asset.type,
-                mime_type=asset.mime_type,
-                url=asset.url,
-                thumbnail_url=asset.thumbnail_url,
-                file_size=asset.file_size,
-                checksum=asset.checksum,
-                technical_specs=asset.technical_specs,
-                metadata=asset.metadata,
-                project_id=asset.project_id,
-                uploaded_by=str(asset.uploaded_by),
-                created_at=asset.created_at,
-                updated_at=asset.updated_at
-            ))
+        asset_responses = _asset_list_adapter.validate_python(assets)
 
         logger.info(f"✅ 媒体资源列表获取成功: {len(asset_responses)} 个资源 - 用户: {current_user.username}")
 
         return AssetListResponse(
             assets=asset_responses,
-            total=total,
-            page=page,
             limit=limit,
-            total_pages=(total + limit - 1) // limit
+            has_more=has_more,
+            next_cursor=next_cursor
         )
 
+    except ValidationError:
+        raise
     except Exception as e:
         logger.error(f"❌ 获取媒体资源列表失败: {str(e)}")
         raise HTTPException(
@@ -358,23 +446,7 @@ async def get_asset(
 
         logger.info(f"✅ 媒体资源详情获取成功: {asset.name} (ID: {asset_id})")
 
-        return AssetResponse(
-            id=asset.id,
-            name=asset.name,
-            original_filename=asset.original_filename,
-            type=asset.type,
-            mime_type=asset.mime_type,
-            url=asset.url,
-            thumbnail_url=asset.thumbnail_url,
-            file_size=asset.file_size,
-            checksum=asset.checksum,
-            technical_specs=asset.technical_specs,
-            metadata=asset.metadata,
-            project_id=asset.project_id,
-            uploaded_by=str(asset.uploaded_by),
-            created_at=asset.created_at,
-            updated_at=asset.updated_at
-        )
+        return AssetResponse.model_validate(asset)
 
     except NotFoundError:
         raise
@@ -400,36 +472,30 @@ async def update_asset(
         update_data: 更新数据
     """
     try:
-        from sqlalchemy import select, update
+        # 准备更新数据
+        update_values = update_data.dict(exclude_unset=True)
+        update_values["updated_at"] = datetime.utcnow()
 
-        # 检查资源是否存在
+        # 单条 UPDATE ... RETURNING 同时完成归属校验、更新和读取
         result = await db.execute(
-            select(MediaAsset).where(
+            update(MediaAsset).
+            where(
                 MediaAsset.id == asset_id,
                 MediaAsset.uploaded_by == current_user.id
-            )
+            ).
+            values(**update_values).
+            returning(MediaAsset)
         )
         asset = result.scalar_one_or_none()
 
         if not asset:
             raise NotFoundError("媒体资源", asset_id)
 
-        # 准备更新数据
-        update_values = update_data.dict(exclude_unset=True)
-        update_values["updated_at"] = datetime.utcnow()
-
-        # 执行更新
-        await db.execute(
-            update(MediaAsset).
-            where(MediaAsset.id == asset_id).
-            values(**update_values)
-        )
         await db.commit()
 
         logger.info(f"✅ 媒体资源更新成功: {asset.name} (ID: {asset_id})")
 
-        # 返回更新后的资源信息
-        return await get_asset(asset_id, current_user, db)
+        return AssetResponse.model_validate(asset)
 
     except NotFoundError:
         raise
@@ -443,6 +509,7 @@ async def update_asset(
 @router.delete("/{asset_id}")
 async def delete_asset(
     asset_id: str,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -453,34 +520,32 @@ async def delete_asset(
         asset_id: 资源ID
     """
     try:
-        from sqlalchemy import select, delete
-
-        # 检查资源是否存在
+        # 单条 DELETE ... RETURNING 同时完成归属校验、删除和存储地址读取
         result = await db.execute(
-            select(MediaAsset).where(
+            delete(MediaAsset).
+            where(
                 MediaAsset.id == asset_id,
                 MediaAsset.uploaded_by == current_user.id
-            )
+            ).
+            returning(MediaAsset.name, MediaAsset.file_url, MediaAsset.asset_metadata, MediaAsset.checksum)
         )
-        asset = result.scalar_one_or_none()
+        asset = result.one_or_none()
 
         if not asset:
             raise NotFoundError("媒体资源", asset_id)
 
-        # 从存储服务删除文件
-        try:
-            await file_storage.delete_file(asset.url)
-            if asset.thumbnail_url:
-                await file_storage.delete_file(asset.thumbnail_url)
-        except Exception as e:
-            logger.warning(f"删除存储文件失败: {str(e)}")
-
-        # 删除数据库记录
-        await db.execute(
-            delete(MediaAsset).where(MediaAsset.id == asset_id)
-        )
         await db.commit()
 
+        # 允许重新上传相同文件
+        if asset.checksum:
+            await _release_checksum(asset.checksum)
+
+        # 响应返回后再从存储服务删除文件（delete_file内部已捕获并记录失败）
+        background_tasks.add_task(file_storage.delete_file, asset.file_url)
+        thumbnail_url = (asset.asset_metadata or {}).get("thumbnail_url")
+        if thumbnail_url:
+            background_tasks.add_task(file_storage.delete_file, thumbnail_url)
+
         logger.info(f"✅ 媒体资源删除成功: {asset.name} (ID: {asset_id})")
 
         return {
@@ -500,6 +565,7 @@ async def delete_asset(
 
 @router.post("/search", response_model=AssetListResponse)
 async def search_assets(
+    request: Request,
     search_request: AssetSearchRequest,
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
@@ -507,7 +573,7 @@ async def search_assets(
     """
     搜索媒体资源
 
-    支持多种搜索条件和过滤器
+    支持多种搜索条件和过滤器；请求头Accept为application/x-ndjson时逐行流式返回
     """
     try:
         from sqlalchemy import select, or_, and_
@@ -523,8 +589,8 @@ async def search_assets(
             conditions.append(
                 or_(
                     MediaAsset.name.ilike(f"%{search_request.query}%"),
-                    MediaAsset.original_filename.ilike(f"%{search_request.query}%"),
-                    MediaAsset.metadata["description"].astext.ilike(f"%{search_request.query}%")
+                    MediaAsset.asset_metadata["original_filename"].as_string().ilike(f"%{search_request.query}%"),
+                    MediaAsset.asset_metadata["description"].as_string().ilike(f"%{search_request.query}%")
                 )
             )
 
@@ -535,9 +601,8 @@ async def search_assets(
             conditions.append(MediaAsset.project_id == search_request.project_id)
 
         if search_request.tags:
-            # 标签匹配 - 简化实现
-            for tag in search_request.tags:
-                conditions.append(MediaAsset.metadata["tags"].astext.ilike(f"%{tag}%"))
+            # 标签包含匹配（@>），可使用tags列的GIN索引
+            conditions.append(MediaAsset.tags.contains(search_request.tags))
 
         if search_request.date_from:
             conditions.append(MediaAsset.created_at >= search_request.date_from)
@@ -549,49 +614,32 @@ async def search_assets(
         if conditions:
             query = query.where(and_(*conditions))
 
-        # 排序和分页
-        query = query.order_by(MediaAsset.created_at.desc())
+        # 排序和游标分页
+        query = _apply_cursor(query, search_request.cursor, search_request.limit)
 
-        from sqlalchemy import func
-        total_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(total_query)
-        total = total_result.scalar()
+        if _accepts_ndjson(request):
+            return StreamingResponse(
+                _stream_assets_ndjson(query, search_request.limit),
+                media_type=NDJSON_MEDIA_TYPE
+            )
 
-        # 执行查询（这里简化处理，实际应该支持分页参数）
-        result = await db.execute(query.limit(50))  # 搜索结果限制50个
-        assets = result.scalars().all()
+        result = await db.execute(query)
+        assets, has_more, next_cursor = _split_page(result.scalars().all(), search_request.limit)
 
         # 转换为响应模型
-        asset_responses = []
-        for asset in assets:
-            asset_responses.append(AssetResponse(
-                id=asset.id,
-                name=asset.name,
-                original_filename=asset.original_filename,
-                type=asset.type,
-                mime_type=asset.mime_type,
-                url=asset.url,
-                thumbnail_url=asset.thumbnail_url,
-                file_size=asset.file_size,
-                checksum=asset.checksum,
-                technical_specs=asset.technical_specs,
-                metadata=asset.metadata,
-                project_id=asset.project_id,
-                uploaded_by=str(asset.uploaded_by),
-                created_at=asset.created_at,
-                updated_at=asset.updated_at
-            ))
+        asset_responses = _asset_list_adapter.validate_python(assets)
 
         logger.info(f"✅ 媒体资源搜索完成: 找到 {len(asset_responses)} 个资源 - 用户: {current_user.username}")
 
         return AssetListResponse(
             assets=asset_responses,
-            total=total,
-            page=1,
-            limit=len(asset_responses),
-            total_pages=1
+            limit=search_request.limit,
+            has_more=has_more,
+            next_cursor=next_cursor
         )
 
+    except ValidationError:
+        raise
     except Exception as e:
         logger.error(f"❌ 媒体资源搜索失败: {str(e)}")
         raise HTTPException(
@@ -600,84 +648,319 @@ async def search_assets(
         )
 
 # 辅助函数
-def _validate_upload_file(file: UploadFile, asset_type: str) -> None:
+def _apply_cursor(query, cursor: Optional[str], limit: int):
+    """
+    按 (created_at, id) 倒序应用游标分页，多取一条用于判断是否还有下一页
+
+    Raises:
+        ValidationError: 如果游标格式无效
+    """
+    if cursor:
+        try:
+            created_at_str, last_id = cursor.split("|", 1)
+            last_created_at = datetime.fromisoformat(created_at_str)
+        except ValueError:
+            raise ValidationError("无效的分页游标", details={"cursor": cursor})
+        query = query.where(
+            tuple_(MediaAsset.created_at, MediaAsset.id) < (last_created_at, last_id)
+        )
+
+    return query.order_by(MediaAsset.created_at.desc(), MediaAsset.id.desc()).limit(limit + 1)
+
+def _split_page(rows, limit: int) -> Tuple[list, bool, Optional[str]]:
+    """截取当前页并生成下一页游标"""
+    has_more = len(rows) > limit
+    page = rows[:limit]
+    next_cursor = None
+    if has_more and page:
+        last = page[-1]
+        next_cursor = f"{last.created_at.isoformat()}|{last.id}"
+    return page, has_more, next_cursor
+
+def _accepts_ndjson(request: Request) -> bool:
+    """客户端是否请求NDJSON流式响应"""
+    return NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+async def _stream_assets_ndjson(query, limit: int):
+    """
+    以NDJSON逐行输出资源列表，末行为分页信息
+
+    使用独立会话并按批从服务端游标读取：依赖注入的会话在响应发送前即已关闭，
+    且无需把整页结果加载到内存
+
+    Args:
+        query: 已应用游标分页的查询（多取一条）
+        limit: 每页数量
+
+    Yields:
+        每个资源一行JSON，最后一行为 {"limit", "has_more", "next_cursor"}
+    """
+    count, last, has_more = 0, None, False
+    try:
+        async with database.async_session_maker() as session:
+            result = await session.stream(query.execution_options(yield_per=STREAM_YIELD_PER))
+            async for asset in result.scalars():
+                if count == limit:
+                    has_more = True
+                    break
+                count += 1
+                last = asset
+                yield orjson.dumps(AssetResponse.model_validate(asset).model_dump()) + b"\n"
+    except Exception as e:
+        # 响应头已发送，无法再返回错误状态码
+        logger.error(f"❌ 媒体资源流式输出失败: {str(e)}")
+        raise
+
+    next_cursor = f"{last.created_at.isoformat()}|{last.id}" if has_more and last else None
+    yield orjson.dumps({"limit": limit, "has_more": has_more, "next_cursor": next_cursor}) + b"\n"
+
+def _dedup_cache_key(checksum: str) -> str:
+    """上传去重的Redis键"""
+    return f"asset:ck:{checksum}"
+
+async def _reserve_checksum(checksum: str) -> Optional[bool]:
+    """
+    在Redis中登记文件校验和（SET NX）
+
+    Returns:
+        True表示登记成功；False表示近期已有相同文件上传完成或正在上传；Redis不可用时返回None
+    """
+    if not redis_manager.is_available:
+        return None
+    try:
+        return bool(await redis_manager.get_client().set(
+            _dedup_cache_key(checksum), "1", nx=True, ex=DEDUP_CACHE_TTL
+        ))
+    except Exception as e:
+        logger.warning(f"Redis去重登记失败: {str(e)}")
+        return None
+
+async def _release_checksum(checksum: str) -> None:
+    """撤销Redis中的校验和登记"""
+    if not redis_manager.is_available:
+        return
+    try:
+        await redis_manager.get_client().delete(_dedup_cache_key(checksum))
+    except Exception as e:
+        logger.warning(f"Redis去重登记撤销失败: {str(e)}")
+
+async def _sampled_fingerprint(path: str, file_size: int) -> str:
+    """
+    计算文件大小加首尾采样数据的xxh3_128指纹，用于去重预筛
+
+    只读取首尾各1MB，大视频也无需再次完整读取；小于2MB的文件等同于完整哈希
+
+    Args:
+        path: 文件路径
+        file_size: 文件大小
+
+    Returns:
+        指纹十六进制字符串
+    """
+    hasher = xxhash.xxh3_128()
+    hasher.update(file_size.to_bytes(8, "little"))
+    async with aiofiles.open(path, 'rb') as f:
+        hasher.update(await f.read(FINGERPRINT_SAMPLE_SIZE))
+        if file_size > FINGERPRINT_SAMPLE_SIZE:
+            await f.seek(max(file_size - FINGERPRINT_SAMPLE_SIZE, FINGERPRINT_SAMPLE_SIZE))
+            hasher.update(await f.read())
+    return hasher.hexdigest()
+
+class _UploadFileTarget(BaseTarget):
+    """
+    multipart文件字段的接收目标
+
+    解析器同步回调，仅暂存数据块，由调用方异步写入和计算哈希
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._pending: List[bytes] = []
+
+    def on_data_received(self, chunk: bytes):
+        self._pending.append(chunk)
+
+    def drain(self) -> List[bytes]:
+        """取出已接收但尚未处理的数据块"""
+        chunks, self._pending = self._pending, []
+        return chunks
+
+async def _stream_multipart_upload(
+    request: Request,
+    dst_path: str
+) -> Tuple[Dict[str, str], _UploadFileTarget, int, str]:
+    """
+    流式解析multipart请求体，文件写入目标路径并增量计算SHA-256
+
+    Args:
+        request: 上传请求
+        dst_path: 目标文件路径
+
+    Returns:
+        (表单字段, 文件字段, 文件大小, SHA-256校验和)
+
+    Raises:
+        ValidationError: 如果请求体格式无效或缺少必填字段
+    """
+    try:
+        parser = StreamingFormDataParser(headers=request.headers)
+    except Exception:
+        raise ValidationError("请求体必须为multipart/form-data")
+
+    file_target = _UploadFileTarget()
+    parser.register("file", file_target)
+    value_targets = {field: ValueTarget() for field in UPLOAD_FORM_FIELDS}
+    for field, target in value_targets.items():
+        parser.register(field, target)
+
+    hasher = hashlib.sha256()
+    file_size = 0
+    buffer = bytearray()
+
+    async def flush(out) -> None:
+        chunk = bytes(buffer)
+        buffer.clear()
+        # 哈希计算时释放GIL，放到线程中执行避免阻塞事件循环
+        if len(chunk) >= HASH_OFFLOAD_THRESHOLD:
+            await asyncio.to_thread(hasher.update, chunk)
+        else:
+            hasher.update(chunk)
+        await out.write(chunk)
+
+    async with aiofiles.open(dst_path, 'wb') as out:
+        # 请求体分块通常只有几十KB，累积后再处理以减少线程切换和写入次数
+        async for body_chunk in request.stream():
+            parser.data_received(body_chunk)
+            for chunk in file_target.drain():
+                buffer += chunk
+                file_size += len(chunk)
+            if len(buffer) >= UPLOAD_CHUNK_SIZE:
+                await flush(out)
+        if buffer:
+            await flush(out)
+
+    form = {
+        field: target.value.decode("utf-8")
+        for field, target in value_targets.items()
+        if target.value
+    }
+
+    missing = [field for field in ("name", "type") if not form.get(field, "").strip()]
+    if not file_target.multipart_filename:
+        missing.append("file")
+    if missing:
+        raise ValidationError("缺少必填字段", details={"missing_fields": missing})
+
+    return form, file_target, file_size, hasher.hexdigest()
+
+def _validate_upload_file(filename: str, content_type: Optional[str], asset_type: str) -> str:
     """
     验证上传文件
 
     Args:
-        file: 上传的文件
+        filename: 上传文件名
+        content_type: 上传文件的MIME类型
         asset_type: 资源类型
 
+    Returns:
+        小写的文件扩展名（含点）
+
     Raises:
         ValidationError: 如果文件验证失败
     """
     # 验证文件类型
-    if not file.content_type:
-        raise ValidationError("无法确定文件类型", details={"filename": file.filename})
+    if not content_type:
+        raise ValidationError("无法确定文件类型", details={"filename": filename})
 
     # 检查MIME类型
-    allowed_mime_types = ALLOWED_MIME_TYPES.get(asset_type, [])
-    if file.content_type not in allowed_mime_types:
+    allowed_mime_types = ALLOWED_MIME_TYPES.get(asset_type, frozenset())
+    if content_type not in allowed_mime_types:
         raise ValidationError(
-            f"不支持的文件类型: {file.content_type}",
+            f"不支持的文件类型: {content_type}",
             details={
-                "allowed_types": allowed_mime_types,
-                "provided_type": file.content_type,
+                "allowed_types": sorted(allowed_mime_types),
+                "provided_type": content_type,
                 "asset_type": asset_type
             }
         )
 
     # 验证文件扩展名
-    file_extension = Path(file.filename).suffix.lower()
-    allowed_extensions = {
-        "image": [".jpg", ".jpeg", ".png", ".webp", ".gif", ".bmp", ".tiff"],
-        "video": [".mp4", ".webm", ".mov", ".avi", ".mpeg"],
-        "audio": [".mp3", ".wav", ".aac", ".m4a", ".ogg", ".flac"],
-        "document": [".pdf", ".doc", ".docx"]
-    }
+    file_extension = os.path.splitext(filename)[1].lower()
+    allowed_extensions = ALLOWED_EXTENSIONS.get(asset_type, frozenset())
 
-    if file_extension not in allowed_extensions.get(asset_type, []):
+    if file_extension not in allowed_extensions:
         raise ValidationError(
             f"不支持的文件扩展名: {file_extension}",
             details={
-                "allowed_extensions": allowed_extensions.get(asset_type, []),
+                "allowed_extensions": sorted(allowed_extensions),
                 "provided_extension": file_extension
             }
         )
 
-async def _extract_technical_specs(file_content: bytes, asset_type: str, mime_type: str) -> Dict[str, Any]:
+    return file_extension
+
+async def _analyze_image(
+    pool: ProcessPoolExecutor,
+    file_content: bytes,
+    generate_thumbnail: bool
+) -> Tuple[Dict[str, Any], Optional[bytes]]:
+    """
+    在进程池中一次解码图片，返回技术规格和缩略图内容
+
+    解析失败时仅记录警告，不影响上传
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(
+            pool, analyze_image, file_content, (300, 300) if generate_thumbnail else None
+        )
+    except Exception as e:
+        logger.warning(f"解析图片失败: {str(e)}")
+        return {}, None
+
+def _probe_image_specs(file_path: str, mime_type: str) -> Dict[str, Any]:
+    """
+    解析图片文件头获取尺寸
+
+    解析失败时仅记录警告，不影响上传
+    """
+    try:
+        return probe_image_specs(file_path, mime_type)
+    except Exception as e:
+        logger.warning(f"解析图片尺寸失败: {str(e)}")
+        return {}
+
+def _extract_technical_specs(
+    asset_type: str,
+    mime_type: str,
+    image_specs: Optional[Dict[str, Any]] = None,
+    *,
+    checksum: str,
+    file_size: int
+) -> Dict[str, Any]:
     """
     提取文件技术规格
 
+    校验和与文件大小由上传流程直接传入，不再重新计算
+
     Args:
-        file_content: 文件内容
         asset_type: 资源类型
         mime_type: MIME类型
+        image_specs: 图片解码得到的规格（仅图片）
+        checksum: 上传时计算的SHA-256校验和
+        file_size: 文件大小
 
     Returns:
         技术规格字典
     """
     specs = {
         "mime_type": mime_type,
-        "file_size": len(file_content),
-        "checksum": hashlib.sha256(file_content).hexdigest()
+        "file_size": file_size,
+        "checksum": checksum
     }
 
     if asset_type == "image":
-        try:
-            from PIL import Image
-            import io
-
-            image = Image.open(io.BytesIO(file_content))
-            specs.update({
-                "width": image.width,
-                "height": image.height,
-                "format": image.format,
-                "mode": image.mode,
-                "color_space": image.mode
-            })
-        except Exception as e:
-            logger.warning(f"提取图片技术规格失败: {str(e)}")
+        specs.update(image_specs or {})
 
     elif asset_type == "video":
         try:
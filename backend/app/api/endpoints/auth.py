@@ -6,22 +6,31 @@
 Handles user authentication, JWT tokens, WeChat login, etc.
 """
 
+import asyncio
 import logging
 from datetime import datetime
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.security import HTTPBearer
-from pydantic import BaseModel, EmailStr, validator
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status
+from fastapi.responses import ORJSONResponse
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+from sqlalchemy import bindparam, select, update, func, or_
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core import database
+from app.core.database import get_db, redis_manager
+from app.core.exceptions import RateLimitError
 from app.core.security import (
     create_tokens_for_user,
     refresh_access_token,
-    verify_password,
+    verify_login_password,
+    DUMMY_PASSWORD_HASH,
     hash_password,
     get_current_user,
+    get_bearer_token,
+    invalidate_cached_user,
+    invalidate_cached_user_id,
+    invalidate_issued_tokens,
     validate_token_data
 )
 from app.models import User
@@ -29,36 +38,44 @@
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(tags=["认证"])
-security = HTTPBearer()
+router = APIRouter(prefix="/auth", tags=["认证"], default_response_class=ORJSONResponse)
+
+# 登录只需要的用户列，避免构造完整ORM对象 / User columns needed by login, avoiding full ORM instances
+_LOGIN_USER_COLUMNS = (User.id, User.username, User.email, User.role, User.is_active, User.hashed_password)
+
+# 预先构建的查询语句，请求时只绑定参数 / Prebuilt statements; requests only bind parameters
+_SELECT_EXISTING_USER = select(User.username, User.email).where(
+    or_(func.lower(User.username) == bindparam("username"), func.lower(User.email) == bindparam("email"))
+)
+_SELECT_LOGIN_USER_BY_EMAIL = select(*_LOGIN_USER_COLUMNS).where(func.lower(User.email) == bindparam("email"))
+_SELECT_LOGIN_USER_BY_PHONE = select(*_LOGIN_USER_COLUMNS).where(User.phone == bindparam("phone"))
 
 
 # 认证相关模型 / Authentication models
 class RegisterRequest(BaseModel):
     """用户注册请求模型 / User registration request model"""
-    username: str
+    # 长度和字符集约束由pydantic-core直接校验 / Length and charset are checked by pydantic-core
+    username: str = Field(min_length=3, max_length=30, pattern=r'^\w+$')
     email: EmailStr
-    password: str
+    password: str = Field(min_length=8)
     phone: Optional[str] = None
     full_name: Optional[str] = None
 
-    @validator('username')
-    def validate_username(cls, v):
-        if len(v) < 3 or len(v) > 30:
-            raise ValueError('用户名长度必须在3-30个字符之间')
-        if not v.replace('_', '').isalnum():
-            raise ValueError('用户名只能包含字母、数字和下划线')
-        return v
-
-    @validator('password')
+    @field_validator('password')
+    @classmethod
     def validate_password(cls, v):
-        if len(v) < 8:
-            raise ValueError('密码长度必须至少为8个字符')
-        if not any(char.isdigit() for char in v):
+        # 单次遍历同时检查数字和字母 / Single pass for both digit and letter checks
+        has_digit = has_alpha = False
+        for char in v:
+            if char.isdigit():
+                has_digit = True
+            elif char.isalpha():
+                has_alpha = True
+            if has_digit and has_alpha:
+                return v
+        if not has_digit:
             raise ValueError('密码必须包含至少一个数字')
-        if not any(char.isalpha() for char in v):
-            raise ValueError('密码必须包含至少一个字母')
-        return v
+        raise ValueError('密码必须包含至少一个字母')
 
 
 class LoginRequest(BaseModel):
@@ -68,12 +85,12 @@ class LoginRequest(BaseModel):
     password: str
     remember_me: bool = False
 
-    @validator('email', 'phone', pre=True)
-    def validate_login_method(cls, v, values):
+    @model_validator(mode='after')
+    def validate_login_method(self):
         # 确保至少提供email或phone / Ensure at least email or phone is provided
-        if not values.get('email') and not values.get('phone'):
+        if not self.email and not self.phone:
             raise ValueError('必须提供邮箱或手机号')
-        return v
+        return self
 
 
 class TokenResponse(BaseModel):
@@ -101,10 +118,62 @@ class UserResponse(BaseModel):
     created_at: datetime
 
 
+async def _record_login(user_id: str, values: dict) -> None:
+    """
+    使用独立会话写入登录信息（最后登录时间、迁移后的密码哈希）
+    Persist login bookkeeping (last login time, migrated password hash) in its own session
+
+    Args:
+        user_id: 用户ID / User ID
+        values: 需要更新的字段 / Columns to update
+    """
+    try:
+        async with database.async_session_maker() as session:
+            await session.execute(update(User).where(User.id == user_id).values(**values))
+            await session.commit()
+        # 迁移后的密码哈希使缓存的用户快照过时
+        if "hashed_password" in values:
+            invalidate_cached_user_id(user_id)
+    except Exception as e:
+        logger.warning("更新登录信息失败: %s", e)
+
+
+async def _check_login_rate(client_ip: str, identifier: str) -> None:
+    """
+    按 (客户端IP, 登录账号) 进行固定窗口限流，Redis不可用时不限流
+    Fixed-window rate limit per (client IP, login identifier); skipped when Redis is unavailable
+
+    Args:
+        client_ip: 客户端IP / Client IP
+        identifier: 登录邮箱或手机号 / Login email or phone
+
+    Raises:
+        RateLimitError: 如果超过限制 / If the limit is exceeded
+    """
+    if not redis_manager.is_available:
+        return
+
+    key = f"auth:login:{client_ip}:{identifier}"
+    try:
+        client = redis_manager.get_client()
+        attempts = await client.incr(key)
+        if attempts == 1:
+            await client.expire(key, settings.LOGIN_RATE_LIMIT_WINDOW)
+    except Exception as e:
+        logger.warning("登录限流检查失败: %s", e)
+        return
+
+    if attempts > settings.LOGIN_RATE_LIMIT:
+        raise RateLimitError(
+            "登录尝试过于频繁，请稍后重试 / Too many login attempts, please try again later",
+            retry_after=settings.LOGIN_RATE_LIMIT_WINDOW
+        )
+
+
 # 认证端点 / Authentication endpoints
 
-@router.post("/register", response_model=TokenResponse)
-async def register(request: RegisterRequest, db: Session = Depends(get_db)):
+@router.post("/register", responses={200: {"model": TokenResponse}})
+async def register(request: RegisterRequest, db: AsyncSession = Depends(get_db)):
     """
     用户注册
     User registration
@@ -117,24 +186,26 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
         包含访问令牌的响应 / Response containing access token
     """
     try:
-        # 检查用户名是否已存在 / Check if username already exists
-        existing_user = db.query(User).filter(User.username == request.username).first()
-        if existing_user:
+        # 一次查询同时检查用户名和邮箱是否已存在（不区分大小写，可使用lower()函数索引）
+        # Check username and email uniqueness in a single case-insensitive query backed by lower() indexes
+        username = request.username.lower()
+        result = await db.execute(
+            _SELECT_EXISTING_USER, {"username": username, "email": request.email.lower()}
+        )
+        existing = result.all()
+        if any(row.username.lower() == username for row in existing):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="用户名已存在 / Username already exists"
             )
-
-        # 检查邮箱是否已存在 / Check if email already exists
-        existing_email = db.query(User).filter(User.email == request.email).first()
-        if existing_email:
+        if existing:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="邮箱已被使用 / Email already in use"
             )
 
         # 创建新用户 / Create new user
-        hashed_password = hash_password(request.password)
+        hashed_password = await asyncio.to_thread(hash_password, request.password)
 
         new_user = User(
             username=request.username,
@@ -147,116 +218,143 @@ async def register(request: RegisterRequest, db: Session = Depends(get_db)):
         )
 
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
+        await db.refresh(new_user)
 
         # 创建令牌 / Create tokens
         tokens = create_tokens_for_user(new_user)
 
-        logger.info(f"用户注册成功: {new_user.username}")
-
-        return TokenResponse(
-            access_token=tokens["access_token"],
-            refresh_token=tokens["refresh_token"],
-            expires_in=tokens["expires_in"],
-            token_type=tokens["token_type"],
-            user={
-                "id": str(new_user.id),
+        logger.info("用户注册成功: %s", new_user.username)
+
+        # 固定结构的令牌响应直接由orjson序列化，跳过jsonable_encoder
+        # Fixed-shape token payload goes straight to orjson, skipping jsonable_encoder
+        return ORJSONResponse({
+            "access_token": tokens["access_token"],
+            "refresh_token": tokens["refresh_token"],
+            "expires_in": tokens["expires_in"],
+            "token_type": tokens["token_type"],
+            "user": {
+                "id": new_user.id,
                 "username": new_user.username,
                 "email": new_user.email,
                 "role": new_user.role
             }
-        )
+        })
 
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
-        logger.error(f"用户注册失败: {e}")
+        await db.rollback()
+        logger.error("用户注册失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="注册失败，请稍后重试 / Registration failed, please try again later"
         )
 
 
-@router.post("/login", response_model=TokenResponse)
-async def login(request: LoginRequest, db: Session = Depends(get_db)):
+@router.post("/login", responses={200: {"model": TokenResponse}})
+async def login(
+    request: LoginRequest,
+    http_request: Request,
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_db)
+):
     """
     用户登录 - 支持邮箱/手机号
     User login - supports email/phone number
 
     Args:
         request: 登录请求数据 / Login request data
+        http_request: HTTP请求 / HTTP request
+        background_tasks: 后台任务 / Background tasks
         db: 数据库会话 / Database session
 
     Returns:
         包含访问令牌的响应 / Response containing access token
     """
     try:
+        # 超过登录频率限制时直接拒绝，不查询数据库也不计算密码哈希
+        # Reject over-limit attempts before the user lookup and password hashing
+        client_ip = http_request.client.host if http_request.client else "unknown"
+        await _check_login_rate(client_ip, (request.email or "").lower() or request.phone or "")
+
         # 查找用户 / Find user
         if request.email:
-            user = db.query(User).filter(User.email == request.email).first()
+            result = await db.execute(_SELECT_LOGIN_USER_BY_EMAIL, {"email": request.email.lower()})
         elif request.phone:
-            user = db.query(User).filter(User.phone == request.phone).first()
+            result = await db.execute(_SELECT_LOGIN_USER_BY_PHONE, {"phone": request.phone})
         else:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="必须提供邮箱或手机号 / Must provide email or phone number"
             )
 
-        if not user:
+        user = result.first()
+
+        # 验证密码：用户不存在时对占位哈希做同样的验证，响应时间不暴露账户是否存在
+        # Verify password; unknown users are checked against a dummy hash so timing does not reveal account existence
+        if user:
+            verified, new_hash = await verify_login_password(str(user.id), request.password, user.hashed_password)
+        else:
+            verified, new_hash = await verify_login_password("", request.password, DUMMY_PASSWORD_HASH)
+
+        # 账户不存在与密码错误返回相同响应，避免枚举账户
+        # Unknown account and wrong password share one response so accounts cannot be enumerated
+        if not user or not verified:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="用户不存在 / User does not exist"
+                detail="邮箱/手机号或密码错误 / Invalid credentials"
             )
 
+        # 仅在密码验证通过后才披露账户状态 / Account state is only disclosed after the password verifies
         if not user.is_active:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="用户账户未激活 / User account is not active"
             )
 
-        # 验证密码 / Verify password
-        if not verify_password(request.password, user.hashed_password):
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="密码错误 / Incorrect password"
-            )
-
         # 更新最后登录时间 / Update last login time
-        user.last_login = datetime.utcnow()
-        db.commit()
+        login_values = {"last_login": datetime.utcnow()}
+
+        # 旧的bcrypt哈希迁移为Argon2id，随最后登录时间一并提交
+        # Migrate a bcrypt hash to Argon2id; committed together with last_login
+        if new_hash:
+            login_values["hashed_password"] = new_hash
+
+        # 响应返回后再写入，不占用登录请求的提交往返
+        # Written after the response is sent, keeping the commit off the login critical path
+        background_tasks.add_task(_record_login, user.id, login_values)
 
         # 创建令牌 / Create tokens
         tokens = create_tokens_for_user(user)
 
-        logger.info(f"用户登录成功: {user.username}")
+        logger.info("用户登录成功: %s", user.username)
 
-        return TokenResponse(
-            access_token=tokens["access_token"],
-            refresh_token=tokens["refresh_token"],
-            expires_in=tokens["expires_in"],
-            token_type=tokens["token_type"],
-            user={
-                "id": str(user.id),
+        return ORJSONResponse({
+            "access_token": tokens["access_token"],
+            "refresh_token": tokens["refresh_token"],
+            "expires_in": tokens["expires_in"],
+            "token_type": tokens["token_type"],
+            "user": {
+                "id": user.id,
                 "username": user.username,
                 "email": user.email,
                 "role": user.role
             }
-        )
+        })
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"用户登录失败: {e}")
+        logger.error("用户登录失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="登录失败，请稍后重试 / Login failed, please try again later"
         )
 
 
-@router.post("/refresh", response_model=TokenResponse)
-async def refresh_token(request: RefreshTokenRequest, db: Session = Depends(get_db)):
+@router.post("/refresh", responses={200: {"model": TokenResponse}})
+async def refresh_token(request: RefreshTokenRequest, db: AsyncSession = Depends(get_db)):
     """
     刷新访问令牌
     Refresh access token
@@ -280,18 +378,18 @@ async def refresh_token(request: RefreshTokenRequest, db: Session = Depends(get_
 
         logger.info("访问令牌刷新成功")
 
-        return TokenResponse(
-            access_token=tokens["access_token"],
-            refresh_token=request.refresh_token,  # 返回相同的刷新令牌 / Return same refresh token
-            expires_in=tokens["expires_in"],
-            token_type=tokens["token_type"],
-            user={}  # 刷新令牌时不返回用户信息 / Don't return user info on token refresh
-        )
+        return ORJSONResponse({
+            "access_token": tokens["access_token"],
+            "refresh_token": request.refresh_token,  # 返回相同的刷新令牌 / Return same refresh token
+            "expires_in": tokens["expires_in"],
+            "token_type": tokens["token_type"],
+            "user": {}  # 刷新令牌时不返回用户信息 / Don't return user info on token refresh
+        })
 
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"令牌刷新失败: {e}")
+        logger.error("令牌刷新失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="令牌刷新失败，请稍后重试 / Token refresh failed, please try again later"
@@ -322,20 +420,29 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
 
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_user)):
+async def logout(
+    current_user: User = Depends(get_current_user),
+    token: str = Depends(get_bearer_token)
+):
     """
     用户登出
     User logout
 
     Args:
         current_user: 当前用户 / Current user
+        token: Bearer令牌 / Bearer token
 
     Returns:
         登出成功消息 / Logout success message
     """
+    # 清除本进程中该令牌的用户缓存及为该用户缓存的已签发令牌
+    # Evict this token's cached user and the user's cached issued tokens
+    invalidate_cached_user(token)
+    invalidate_issued_tokens(str(current_user.id))
+
     # 在实际应用中，这里可以处理令牌黑名单等逻辑
     # In real applications, this could handle token blacklisting, etc.
-    logger.info(f"用户登出: {current_user.username}")
+    logger.info("用户登出: %s", current_user.username)
 
     return {
         "message": "登出成功 / Logout successful",
@@ -344,7 +451,7 @@ async def logout(current_user: User = Depends(get_current_user)):
 
 
 @router.get("/wechat/callback")
-async def wechat_callback(code: str, state: Optional[str] = None, db: Session = Depends(get_db)):
+async def wechat_callback(code: str, state: Optional[str] = None, db: AsyncSession = Depends(get_db)):
     """
     微信登录回调
     WeChat login callback
@@ -364,7 +471,7 @@ async def wechat_callback(code: str, state: Optional[str] = None, db: Session =
         # 这里应该调用微信API获取用户信息
         # This should call WeChat API to get user information
 
-        logger.info(f"微信登录回调: code={code}, state={state}")
+        logger.info("微信登录回调: code=%s, state=%s", code, state)
 
         return {
             "message": "微信登录功能待实现 / WeChat login feature to be implemented",
@@ -373,11 +480,11 @@ async def wechat_callback(code: str, state: Optional[str] = None, db: Session =
         }
 
     except Exception as e:
-        logger.error(f"微信登录回调失败: {e}")
+        logger.error("微信登录回调失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="微信登录处理失败 / WeChat login processing failed"
         )
 
 
-logger.info("✅ 认证API端点配置完成 - JWT认证系统已实现")
\ No newline at end of file
+logger.debug("✅ 认证API端点配置完成 - JWT认证系统已实现")
\ No newline at end of file
@@ -12,12 +12,18 @@
 from uuid import uuid4
 
 from fastapi import APIRouter, Depends, HTTPException, status, Query, Path
-from pydantic import BaseModel, Field, validator
+from fastapi.responses import ORJSONResponse
+from cachetools import TTLCache
+from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy.orm import contains_eager, selectinload
+from sqlalchemy import bindparam, select, update, delete, exists, and_, or_, func
 
-from app.core.database import get_db, Permission, Role, UserRole, RolePermission, ResourcePermission
-from app.core.security import get_current_user
+from app.core.database import (
+    get_db, Permission, Role, UserRole, RolePermission, ResourcePermission,
+    PermissionResource, PermissionAction, RoleType
+)
+from app.core.security import get_current_user, invalidate_cached_user_id
 from app.core.permissions import (
     require_admin, require_permission, PermissionChecker,
     require_user_manage, require_role_manage
@@ -27,7 +33,44 @@
 from app.services.permissions import permission_service, PermissionService
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# 由数据库生成的 UTC 时间戳（与列上 datetime.utcnow 默认值一致，为无时区时间）
+_UTC_NOW = func.timezone("UTC", func.now())
+
+# 关联表的固定查询语句，模块加载时构建一次，参数在执行时绑定
+_SELECT_ROLE_PERMISSIONS = (
+    select(RolePermission)
+    .options(selectinload(RolePermission.permission))
+    .where(RolePermission.role_id == bindparam("role_id"))
+    .order_by(RolePermission.created_at.desc())
+)
+# 以用户表为起点 LEFT JOIN 有效角色：无行表示用户不存在，UserRole 为空表示没有角色
+_SELECT_USER_WITH_ACTIVE_ROLES = (
+    select(User.id, UserRole)
+    .select_from(User)
+    .outerjoin(UserRole, and_(UserRole.user_id == User.id, UserRole.is_active == True))
+    .outerjoin(Role, Role.id == UserRole.role_id)
+    .options(contains_eager(UserRole.role))
+    .where(User.id == bindparam("user_id"))
+    .order_by(UserRole.created_at.desc())
+)
+_DELETE_ROLE_PERMISSION = delete(RolePermission).where(
+    and_(
+        RolePermission.role_id == bindparam("role_id"),
+        RolePermission.permission_id == bindparam("permission_id")
+    )
+).execution_options(synchronize_session=False)
+_DEACTIVATE_USER_ROLE = update(UserRole).where(
+    and_(
+        UserRole.user_id == bindparam("user_id"),
+        UserRole.role_id == bindparam("role_id"),
+        UserRole.is_active == True
+    )
+).values(is_active=False, updated_at=bindparam("now")).execution_options(synchronize_session=False)
+
+# 权限/角色目录列表缓存，按过滤参数索引；目录很少变更，变更时清空
+_catalog_cache: TTLCache = TTLCache(maxsize=256, ttl=60)
 
 # 权限模型定义
 class PermissionResponse(BaseModel):
@@ -48,32 +91,20 @@ class Config:
         from_attributes = True
 
 
+# 列表查询只取响应所需的列，结果为行元组，不进入会话身份映射
+_PERMISSION_COLUMNS = tuple(getattr(Permission, name) for name in PermissionResponse.model_fields)
+
+
 class PermissionCreateRequest(BaseModel):
     """权限创建请求模型"""
     name: str = Field(..., min_length=3, max_length=100, description="权限名称（英文）")
     description: str = Field(..., max_length=500, description="权限描述（英文）")
-    resource: str = Field(..., description="资源类型")
-    action: str = Field(..., description="操作类型")
+    resource: PermissionResource = Field(..., description="资源类型")
+    action: PermissionAction = Field(..., description="操作类型")
     name_zh: str = Field(..., min_length=1, max_length=100, description="权限名称（中文）")
     description_zh: str = Field(..., max_length=500, description="权限描述（中文）")
     category: str = Field(default="general", description="权限分类")
 
-    @validator('resource')
-    def validate_resource(cls, v):
-        from app.core.database import PermissionResource
-        valid_resources = [r.value for r in PermissionResource]
-        if v not in valid_resources:
-            raise ValueError(f'无效的资源类型: {v}. 有效类型: {valid_resources}')
-        return v
-
-    @validator('action')
-    def validate_action(cls, v):
-        from app.core.database import PermissionAction
-        valid_actions = [a.value for a in PermissionAction]
-        if v not in valid_actions:
-            raise ValueError(f'无效的操作类型: {v}. 有效类型: {valid_actions}')
-        return v
-
 
 class RoleResponse(BaseModel):
     """角色响应模型"""
@@ -95,24 +126,19 @@ class Config:
         from_attributes = True
 
 
+_ROLE_COLUMNS = tuple(getattr(Role, name) for name in RoleResponse.model_fields)
+
+
 class RoleCreateRequest(BaseModel):
     """角色创建请求模型"""
     name: str = Field(..., min_length=3, max_length=100, description="角色名称（英文）")
     description: str = Field(..., max_length=500, description="角色描述（英文）")
     name_zh: str = Field(..., min_length=1, max_length=100, description="角色名称（中文）")
     description_zh: str = Field(..., max_length=500, description="角色描述（中文）")
-    role_type: str = Field(default="custom", description="角色类型")
+    role_type: RoleType = Field(default=RoleType.CUSTOM, description="角色类型")
     parent_role_id: Optional[str] = Field(None, description="父角色ID")
     organization_id: Optional[str] = Field(None, description="组织ID")
 
-    @validator('role_type')
-    def validate_role_type(cls, v):
-        from app.core.database import RoleType
-        valid_types = [t.value for t in RoleType]
-        if v not in valid_types:
-            raise ValueError(f'无效的角色类型: {v}. 有效类型: {valid_types}')
-        return v
-
 
 class RolePermissionResponse(BaseModel):
     """角色权限响应模型"""
@@ -166,27 +192,11 @@ class UserRoleAssignRequest(BaseModel):
 
 class PermissionCheckRequest(BaseModel):
     """权限检查请求模型"""
-    resource: str = Field(..., description="资源类型")
-    action: str = Field(..., description="操作类型")
+    resource: PermissionResource = Field(..., description="资源类型")
+    action: PermissionAction = Field(..., description="操作类型")
     resource_id: Optional[str] = Field(None, description="特定资源ID")
     conditions: Dict[str, Any] = Field(default_factory=dict, description="额外条件")
 
-    @validator('resource')
-    def validate_resource(cls, v):
-        from app.core.database import PermissionResource
-        valid_resources = [r.value for r in PermissionResource]
-        if v not in valid_resources:
-            raise ValueError(f'无效的资源类型: {v}. 有效类型: {valid_resources}')
-        return v
-
-    @validator('action')
-    def validate_action(cls, v):
-        from app.core.database import PermissionAction
-        valid_actions = [a.value for a in PermissionAction]
-        if v not in valid_actions:
-            raise ValueError(f'无效的操作类型: {v}. 有效类型: {valid_actions}')
-        return v
-
 
 class PermissionCheckResponse(BaseModel):
     """权限检查响应模型"""
@@ -197,12 +207,33 @@ class PermissionCheckResponse(BaseModel):
     details: Dict[str, Any]
 
 
+class PermissionCheckBatchRequest(BaseModel):
+    """批量权限检查请求模型"""
+    checks: List[PermissionCheckRequest] = Field(..., min_length=1, max_length=200, description="检查项列表")
+
+
+class PermissionCheckBatchResponse(BaseModel):
+    """批量权限检查响应模型"""
+    results: List[PermissionCheckResponse]
+
+
+def _construct_response(model, obj, **overrides):
+    """
+    按响应字段从 ORM 对象构造响应模型
+
+    数据来自类型化的数据库列，使用 model_construct 跳过逐字段校验
+    """
+    values = {name: getattr(obj, name) for name in model.model_fields if name not in overrides}
+    values.update(overrides)
+    return model.model_construct(**values)
+
+
 # API端点实现
 
 @router.get("/permissions", response_model=List[PermissionResponse])
 async def get_permissions(
-    resource: Optional[str] = Query(None, description="资源类型过滤"),
-    action: Optional[str] = Query(None, description="操作类型过滤"),
+    resource: Optional[PermissionResource] = Query(None, description="资源类型过滤"),
+    action: Optional[PermissionAction] = Query(None, description="操作类型过滤"),
     category: Optional[str] = Query(None, description="分类过滤"),
     is_system: Optional[bool] = Query(None, description="是否系统权限"),
     current_user: User = Depends(require_admin),
@@ -214,7 +245,12 @@ async def get_permissions(
     支持多种过滤条件和分页
     """
     try:
-        query = select(Permission)
+        cache_key = ("permissions", resource, action, category, is_system)
+        cached = _catalog_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        query = select(*_PERMISSION_COLUMNS)
 
         # 应用过滤条件
         if resource:
@@ -229,13 +265,14 @@ async def get_permissions(
         query = query.order_by(Permission.category, Permission.name)
 
         result = await db.execute(query)
-        permissions = result.scalars().all()
+        permissions = [PermissionResponse.model_construct(**row) for row in result.mappings()]
+        _catalog_cache[cache_key] = permissions
 
-        logger.info(f"✅ 权限列表获取成功: {len(permissions)} 个权限 - 用户: {current_user.username}")
+        logger.info("✅ 权限列表获取成功: %s 个权限 - 用户: %s", len(permissions), current_user.username)
         return permissions
 
     except Exception as e:
-        logger.error(f"❌ 获取权限列表失败: {str(e)}")
+        logger.error("❌ 获取权限列表失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="获取权限列表失败"
@@ -254,26 +291,26 @@ async def create_permission(
     只有管理员可以创建权限
     """
     try:
-        from app.core.database import PermissionResource, PermissionAction
-
         permission = await permission_service.create_permission(
             db=db,
             name=permission_data.name,
             description=permission_data.description,
-            resource=PermissionResource(permission_data.resource),
-            action=PermissionAction(permission_data.action),
+            resource=permission_data.resource,
+            action=permission_data.action,
             name_zh=permission_data.name_zh,
             description_zh=permission_data.description_zh,
             category=permission_data.category,
             is_system=False
         )
 
+        _catalog_cache.clear()
+
         return permission
 
     except ValidationError:
         raise
     except Exception as e:
-        logger.error(f"❌ 创建权限失败: {str(e)}")
+        logger.error("❌ 创建权限失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="创建权限失败"
@@ -297,13 +334,13 @@ async def get_permission(
         if not permission:
             raise NotFoundError("权限", permission_id)
 
-        logger.info(f"✅ 权限详情获取成功: {permission.name} (ID: {permission_id})")
+        logger.info("✅ 权限详情获取成功: %s (ID: %s)", permission.name, permission_id)
         return permission
 
     except NotFoundError:
         raise
     except Exception as e:
-        logger.error(f"❌ 获取权限详情失败: {str(e)}")
+        logger.error("❌ 获取权限详情失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="获取权限详情失败"
@@ -325,30 +362,33 @@ async def update_permission(
         permission_data: 更新的权限数据
     """
     try:
-        permission = await db.get(Permission, permission_id)
-        if not permission:
-            raise NotFoundError("权限", permission_id)
+        # 单条 UPDATE ... RETURNING 完成更新并取回结果，系统权限不会被匹配
+        update_data = permission_data.dict()
+        permission = await db.scalar(
+            update(Permission)
+            .where(Permission.id == permission_id, Permission.is_system == False)
+            .values(**update_data, updated_at=_UTC_NOW)
+            .returning(Permission)
+        )
 
-        # 系统权限不允许修改
-        if permission.is_system:
+        if permission is None:
+            # 未更新时区分不存在与系统权限
+            is_system = await db.scalar(select(Permission.is_system).where(Permission.id == permission_id))
+            if is_system is None:
+                raise NotFoundError("权限", permission_id)
             raise ValidationError("系统权限不允许修改")
 
-        # 更新权限信息
-        update_data = permission_data.dict()
-        for field, value in update_data.items():
-            setattr(permission, field, value)
-
-        permission.updated_at = datetime.utcnow()
         await db.commit()
-        await db.refresh(permission)
+        _catalog_cache.clear()
+        await permission_service.invalidate_user_permissions()
 
-        logger.info(f"✅ 权限更新成功: {permission.name} (ID: {permission_id})")
+        logger.info("✅ 权限更新成功: %s (ID: %s)", permission.name, permission_id)
         return permission
 
     except (NotFoundError, ValidationError):
         raise
     except Exception as e:
-        logger.error(f"❌ 更新权限失败: {str(e)}")
+        logger.error("❌ 更新权限失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="更新权限失败"
@@ -376,27 +416,29 @@ async def delete_permission(
         if permission.is_system:
             raise ValidationError("系统权限不允许删除")
 
-        # 检查是否有角色正在使用此权限
-        role_perms = await db.execute(
-            select(RolePermission).where(RolePermission.permission_id == permission_id)
+        # 检查是否有角色正在使用此权限（EXISTS只返回一个布尔值）
+        in_use = await db.scalar(
+            select(exists().where(RolePermission.permission_id == permission_id))
         )
-        if role_perms.scalar_one_or_none():
+        if in_use:
             raise ValidationError("此权限正在被角色使用，无法删除")
 
         await db.delete(permission)
         await db.commit()
+        _catalog_cache.clear()
+        await permission_service.invalidate_user_permissions()
 
-        logger.info(f"✅ 权限删除成功: {permission.name} (ID: {permission_id})")
+        logger.info("✅ 权限删除成功: %s (ID: %s)", permission.name, permission_id)
         return {
             "message": "权限删除成功",
             "permission_id": permission_id,
-            "deleted_at": datetime.utcnow().isoformat()
+            "deleted_at": datetime.utcnow()
         }
 
     except (NotFoundError, ValidationError):
         raise
     except Exception as e:
-        logger.error(f"❌ 删除权限失败: {str(e)}")
+        logger.error("❌ 删除权限失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="删除权限失败"
@@ -405,7 +447,7 @@ async def delete_permission(
 
 @router.get("/roles", response_model=List[RoleResponse])
 async def get_roles(
-    role_type: Optional[str] = Query(None, description="角色类型过滤"),
+    role_type: Optional[RoleType] = Query(None, description="角色类型过滤"),
     organization_id: Optional[str] = Query(None, description="组织ID过滤"),
     is_active: Optional[bool] = Query(None, description="是否激活"),
     is_system: Optional[bool] = Query(None, description="是否系统角色"),
@@ -418,7 +460,12 @@ async def get_roles(
     支持多种过滤条件和分页
     """
     try:
-        query = select(Role)
+        cache_key = ("roles", role_type, organization_id, is_active, is_system)
+        cached = _catalog_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        query = select(*_ROLE_COLUMNS)
 
         # 应用过滤条件
         if role_type:
@@ -433,13 +480,14 @@ async def get_roles(
         query = query.order_by(Role.level, Role.name)
 
         result = await db.execute(query)
-        roles = result.scalars().all()
+        roles = [RoleResponse.model_construct(**row) for row in result.mappings()]
+        _catalog_cache[cache_key] = roles
 
-        logger.info(f"✅ 角色列表获取成功: {len(roles)} 个角色 - 用户: {current_user.username}")
+        logger.info("✅ 角色列表获取成功: %s 个角色 - 用户: %s", len(roles), current_user.username)
         return roles
 
     except Exception as e:
-        logger.error(f"❌ 获取角色列表失败: {str(e)}")
+        logger.error("❌ 获取角色列表失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="获取角色列表失败"
@@ -458,26 +506,26 @@ async def create_role(
     只有管理员可以创建角色
     """
     try:
-        from app.core.database import RoleType
-
         role = await permission_service.create_role(
             db=db,
             name=role_data.name,
             description=role_data.description,
             name_zh=role_data.name_zh,
             description_zh=role_data.description_zh,
-            role_type=RoleType(role_data.role_type),
+            role_type=role_data.role_type,
             parent_role_id=role_data.parent_role_id,
             organization_id=role_data.organization_id,
             is_system=False
         )
 
+        _catalog_cache.clear()
+
         return role
 
     except ValidationError:
         raise
     except Exception as e:
-        logger.error(f"❌ 创建角色失败: {str(e)}")
+        logger.error("❌ 创建角色失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="创建角色失败"
@@ -501,13 +549,13 @@ async def get_role(
         if not role:
             raise NotFoundError("角色", role_id)
 
-        logger.info(f"✅ 角色详情获取成功: {role.name} (ID: {role_id})")
+        logger.info("✅ 角色详情获取成功: %s (ID: %s)", role.name, role_id)
         return role
 
     except NotFoundError:
         raise
     except Exception as e:
-        logger.error(f"❌ 获取角色详情失败: {str(e)}")
+        logger.error("❌ 获取角色详情失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="获取角色详情失败"
@@ -529,30 +577,33 @@ async def update_role(
         role_data: 更新的角色数据
     """
     try:
-        role = await db.get(Role, role_id)
-        if not role:
-            raise NotFoundError("角色", role_id)
+        # 单条 UPDATE ... RETURNING 完成更新并取回结果，系统角色不会被匹配
+        update_data = role_data.dict(exclude_unset=True)
+        role = await db.scalar(
+            update(Role)
+            .where(Role.id == role_id, Role.is_system == False)
+            .values(**update_data, updated_at=_UTC_NOW)
+            .returning(Role)
+        )
 
-        # 系统角色不允许修改
-        if role.is_system:
+        if role is None:
+            # 未更新时区分不存在与系统角色
+            is_system = await db.scalar(select(Role.is_system).where(Role.id == role_id))
+            if is_system is None:
+                raise NotFoundError("角色", role_id)
             raise ValidationError("系统角色不允许修改")
 
-        # 更新角色信息
-        update_data = role_data.dict(exclude_unset=True)
-        for field, value in update_data.items():
-            setattr(role, field, value)
-
-        role.updated_at = datetime.utcnow()
         await db.commit()
-        await db.refresh(role)
+        _catalog_cache.clear()
+        await permission_service.invalidate_user_permissions()
 
-        logger.info(f"✅ 角色更新成功: {role.name} (ID: {role_id})")
+        logger.info("✅ 角色更新成功: %s (ID: %s)", role.name, role_id)
         return role
 
     except (NotFoundError, ValidationError):
         raise
     except Exception as e:
-        logger.error(f"❌ 更新角色失败: {str(e)}")
+        logger.error("❌ 更新角色失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="更新角色失败"
@@ -580,27 +631,29 @@ async def delete_role(
         if role.is_system:
             raise ValidationError("系统角色不允许删除")
 
-        # 检查是否有用户正在使用此角色
-        user_roles = await db.execute(
-            select(UserRole).where(UserRole.role_id == role_id)
+        # 检查是否有用户正在使用此角色（EXISTS只返回一个布尔值）
+        in_use = await db.scalar(
+            select(exists().where(UserRole.role_id == role_id))
         )
-        if user_roles.scalar_one_or_none():
+        if in_use:
             raise ValidationError("此角色正在被用户使用，无法删除")
 
         await db.delete(role)
         await db.commit()
+        _catalog_cache.clear()
+        await permission_service.invalidate_user_permissions()
 
-        logger.info(f"✅ 角色删除成功: {role.name} (ID: {role_id})")
+        logger.info("✅ 角色删除成功: %s (ID: %s)", role.name, role_id)
         return {
             "message": "角色删除成功",
             "role_id": role_id,
-            "deleted_at": datetime.utcnow().isoformat()
+            "deleted_at": datetime.utcnow()
         }
 
     except (NotFoundError, ValidationError):
         raise
     except Exception as e:
-        logger.error(f"❌ 删除角色失败: {str(e)}")
+        logger.error("❌ 删除角色失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="删除角色失败"
@@ -620,25 +673,26 @@ async def get_role_permissions(
         role_id: 角色ID
     """
     try:
-        role = await db.get(Role, role_id)
-        if not role:
-            raise NotFoundError("角色", role_id)
-
-        result = await db.execute(
-            select(RolePermission)
-            .options(selectinload(RolePermission.permission))
-            .where(RolePermission.role_id == role_id)
-            .order_by(RolePermission.created_at.desc())
-        )
+        result = await db.execute(_SELECT_ROLE_PERMISSIONS, {"role_id": role_id})
         role_permissions = result.scalars().all()
 
-        logger.info(f"✅ 角色权限列表获取成功: {role.name} - {len(role_permissions)} 个权限")
-        return role_permissions
+        # 结果为空时才检查角色是否存在
+        if not role_permissions and not await db.scalar(select(exists().where(Role.id == role_id))):
+            raise NotFoundError("角色", role_id)
+
+        logger.info("✅ 角色权限列表获取成功: 角色 %s - %s 个权限", role_id, len(role_permissions))
+        return [
+            _construct_response(
+                RolePermissionResponse, rp,
+                permission=_construct_response(PermissionResponse, rp.permission)
+            )
+            for rp in role_permissions
+        ]
 
     except NotFoundError:
         raise
     except Exception as e:
-        logger.error(f"❌ 获取角色权限列表失败: {str(e)}")
+        logger.error("❌ 获取角色权限列表失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="获取角色权限列表失败"
@@ -670,15 +724,12 @@ async def assign_permission_to_role(
             expires_at=assignment_data.expires_at
         )
 
-        # 加载权限信息
-        await db.refresh(role_permission, attribute_names=['permission'])
-
         return role_permission
 
     except (NotFoundError, ValidationError):
         raise
     except Exception as e:
-        logger.error(f"❌ 分配角色权限失败: {str(e)}")
+        logger.error("❌ 分配角色权限失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="分配角色权限失败"
@@ -700,35 +751,29 @@ async def revoke_permission_from_role(
         permission_id: 权限ID
     """
     try:
-        # 查找角色权限关联
+        # 单条 DELETE 同时完成查找和删除，按影响行数判断是否存在
         result = await db.execute(
-            select(RolePermission).where(
-                and_(
-                    RolePermission.role_id == role_id,
-                    RolePermission.permission_id == permission_id
-                )
-            )
+            _DELETE_ROLE_PERMISSION, {"role_id": role_id, "permission_id": permission_id}
         )
-        role_permission = result.scalar_one_or_none()
 
-        if not role_permission:
+        if result.rowcount == 0:
             raise NotFoundError("角色权限关联")
 
-        await db.delete(role_permission)
         await db.commit()
+        await permission_service.invalidate_user_permissions()
 
-        logger.info(f"✅ 角色权限撤销成功: 角色 {role_id} -> 权限 {permission_id}")
+        logger.info("✅ 角色权限撤销成功: 角色 %s -> 权限 %s", role_id, permission_id)
         return {
             "message": "权限撤销成功",
             "role_id": role_id,
             "permission_id": permission_id,
-            "revoked_at": datetime.utcnow().isoformat()
+            "revoked_at": datetime.utcnow()
         }
 
     except NotFoundError:
         raise
     except Exception as e:
-        logger.error(f"❌ 撤销角色权限失败: {str(e)}")
+        logger.error("❌ 撤销角色权限失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="撤销角色权限失败"
@@ -748,31 +793,22 @@ async def get_user_roles(
         user_id: 用户ID
     """
     try:
-        # 检查用户是否存在
-        user = await db.get(User, user_id)
-        if not user:
+        # 用户存在性与角色列表在同一查询中取得
+        rows = (await db.execute(_SELECT_USER_WITH_ACTIVE_ROLES, {"user_id": user_id})).all()
+        if not rows:
             raise NotFoundError("用户", user_id)
+        user_roles = [row.UserRole for row in rows if row.UserRole is not None]
 
-        result = await db.execute(
-            select(UserRole)
-            .options(selectinload(UserRole.role))
-            .where(
-                and_(
-                    UserRole.user_id == user_id,
-                    UserRole.is_active == True
-                )
-            )
-            .order_by(UserRole.created_at.desc())
-        )
-        user_roles = result.scalars().all()
-
-        logger.info(f"✅ 用户角色列表获取成功: {user.username} - {len(user_roles)} 个角色")
-        return user_roles
+        logger.info("✅ 用户角色列表获取成功: 用户 %s - %s 个角色", user_id, len(user_roles))
+        return [
+            _construct_response(UserRoleResponse, ur, role=_construct_response(RoleResponse, ur.role))
+            for ur in user_roles
+        ]
 
     except NotFoundError:
         raise
     except Exception as e:
-        logger.error(f"❌ 获取用户角色列表失败: {str(e)}")
+        logger.error("❌ 获取用户角色列表失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="获取用户角色列表失败"
@@ -803,15 +839,12 @@ async def assign_role_to_user(
             expires_at=assignment_data.expires_at
         )
 
-        # 加载角色信息
-        await db.refresh(user_role, attribute_names=['role'])
-
         return user_role
 
     except (NotFoundError, ValidationError):
         raise
     except Exception as e:
-        logger.error(f"❌ 分配用户角色失败: {str(e)}")
+        logger.error("❌ 分配用户角色失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="分配用户角色失败"
@@ -833,38 +866,33 @@ async def revoke_role_from_user(
         role_id: 角色ID
     """
     try:
-        # 查找用户角色关联
+        # 同一时间戳用于数据库与响应
+        now = datetime.utcnow()
+
+        # 软删除（设置为非激活状态），单条 UPDATE 按影响行数判断是否存在
         result = await db.execute(
-            select(UserRole).where(
-                and_(
-                    UserRole.user_id == user_id,
-                    UserRole.role_id == role_id,
-                    UserRole.is_active == True
-                )
-            )
+            _DEACTIVATE_USER_ROLE, {"user_id": user_id, "role_id": role_id, "now": now}
         )
-        user_role = result.scalar_one_or_none()
 
-        if not user_role:
+        if result.rowcount == 0:
             raise NotFoundError("用户角色关联")
 
-        # 软删除（设置为非激活状态）
-        user_role.is_active = False
-        user_role.updated_at = datetime.utcnow()
         await db.commit()
+        await permission_service.invalidate_user_permissions(user_id)
+        invalidate_cached_user_id(user_id)
 
-        logger.info(f"✅ 用户角色撤销成功: 用户 {user_id} -> 角色 {role_id}")
+        logger.info("✅ 用户角色撤销成功: 用户 %s -> 角色 %s", user_id, role_id)
         return {
             "message": "角色撤销成功",
             "user_id": user_id,
             "role_id": role_id,
-            "revoked_at": datetime.utcnow().isoformat()
+            "revoked_at": now
         }
 
     except NotFoundError:
         raise
     except Exception as e:
-        logger.error(f"❌ 撤销用户角色失败: {str(e)}")
+        logger.error("❌ 撤销用户角色失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="撤销用户角色失败"
@@ -883,46 +911,101 @@ async def check_permission(
     用于前端或其他服务检查用户是否有特定权限
     """
     try:
-        from app.core.database import PermissionResource, PermissionAction
-
         has_permission = await permission_service.check_permission(
             db=db,
             user_id=current_user.id,
-            resource=PermissionResource(check_request.resource),
-            action=PermissionAction(check_request.action),
+            resource=check_request.resource,
+            action=check_request.action,
             resource_id=check_request.resource_id,
             conditions=check_request.conditions
         )
 
         logger.info(
-            f"权限检查 - 用户: {current_user.username}, "
-            f"资源: {check_request.resource}, 操作: {check_request.action}, "
-            f"结果: {has_permission}"
+            "权限检查 - 用户: %s, 资源: %s, 操作: %s, 结果: %s",
+            current_user.username, check_request.resource.value, check_request.action.value, has_permission
         )
 
         return PermissionCheckResponse(
             has_permission=has_permission,
-            resource=check_request.resource,
-            action=check_request.action,
+            resource=check_request.resource.value,
+            action=check_request.action.value,
             resource_id=check_request.resource_id,
             details={
                 "user_id": current_user.id,
                 "username": current_user.username,
-                "checked_at": datetime.utcnow().isoformat()
+                "checked_at": datetime.utcnow()
             }
         )
 
     except Exception as e:
-        logger.error(f"❌ 权限检查失败: {str(e)}")
+        logger.error("❌ 权限检查失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="权限检查失败"
         )
 
 
+@router.post("/check-batch", response_model=PermissionCheckBatchResponse)
+async def check_permissions_batch(
+    batch_request: PermissionCheckBatchRequest,
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    批量检查用户权限
+
+    前端渲染页面时一次提交多个检查项，服务端只解析一次角色与权限
+    """
+    try:
+        checks = batch_request.checks
+        results = await permission_service.check_permissions_bulk(
+            db=db,
+            user_id=current_user.id,
+            checks=[
+                {
+                    "resource": c.resource,
+                    "action": c.action,
+                    "resource_id": c.resource_id,
+                    "conditions": c.conditions
+                }
+                for c in checks
+            ]
+        )
+
+        logger.info(
+            "批量权限检查 - 用户: %s, 检查项: %s, 通过: %s",
+            current_user.username, len(checks), sum(results)
+        )
+
+        details = {
+            "user_id": current_user.id,
+            "username": current_user.username,
+            "checked_at": datetime.utcnow()
+        }
+        return PermissionCheckBatchResponse(
+            results=[
+                PermissionCheckResponse(
+                    has_permission=has_permission,
+                    resource=c.resource.value,
+                    action=c.action.value,
+                    resource_id=c.resource_id,
+                    details=details
+                )
+                for c, has_permission in zip(checks, results)
+            ]
+        )
+
+    except Exception as e:
+        logger.error("❌ 批量权限检查失败: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="批量权限检查失败"
+        )
+
+
 @router.get("/my-permissions", response_model=List[Dict[str, Any]])
 async def get_my_permissions(
-    resource: Optional[str] = Query(None, description="资源类型过滤"),
+    resource: Optional[PermissionResource] = Query(None, description="资源类型过滤"),
     current_user: User = Depends(get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
@@ -932,23 +1015,17 @@ async def get_my_permissions(
     用户可以查看自己拥有的所有权限
     """
     try:
-        from app.core.database import PermissionResource
-
-        resource_filter = None
-        if resource:
-            resource_filter = PermissionResource(resource)
-
         permissions = await permission_service.get_user_permissions(
             db=db,
             user_id=current_user.id,
-            resource=resource_filter
+            resource=resource
         )
 
-        logger.info(f"✅ 用户权限列表获取成功: {current_user.username} - {len(permissions)} 个权限")
+        logger.info("✅ 用户权限列表获取成功: %s - %s 个权限", current_user.username, len(permissions))
         return permissions
 
     except Exception as e:
-        logger.error(f"❌ 获取用户权限列表失败: {str(e)}")
+        logger.error("❌ 获取用户权限列表失败: %s", e)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="获取用户权限列表失败"
@@ -7,12 +7,14 @@
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from typing import List, Optional
+from typing import List, Optional, Union
 from pydantic import BaseModel, Field
 from datetime import datetime
 from uuid import uuid4
 import re
+import unicodedata
 
 from app.core.database import get_db, Project, ProjectStatus, PlatformTarget
 from app.core.exceptions import NotFoundError, ValidationError, PermissionDeniedError
@@ -32,19 +34,43 @@
 )
 from loguru import logger
 
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# slug 生成使用的正则，模块加载时编译一次
+_SLUG_STRIP = re.compile(r'[^\u4e00-\u9fa5a-zA-Z0-9\s-]')
+_SLUG_WS = re.compile(r'\s+')
+
+# 中日韩字符检测：这些字符无大小写，搜索时改用 LIKE 以跳过大小写折叠
+_CJK_PATTERN = re.compile(r'[\u4e00-\u9fff\u3040-\u30ff\uac00-\ud7af]')
+
+# 参与列表搜索的业务输入字段
+SEARCHABLE_BUSINESS_FIELDS = ("target_audience", "key_message", "brand_voice")
+
+
+def normalize_search_text(text: Optional[str]) -> Optional[str]:
+    """NFKC 规范化，使全角字母数字等与半角形式一致，写入与搜索两侧共用"""
+    if not text or text.isascii():
+        return text
+    return unicodedata.normalize("NFKC", text)
+
+
+def _normalize_searchable_fields(validated_data: dict) -> None:
+    """就地规范化项目中参与搜索的文本字段"""
+    validated_data["title"] = normalize_search_text(validated_data["title"])
+    validated_data["description"] = normalize_search_text(validated_data.get("description"))
+    business_input = validated_data["business_input"]
+    for field in SEARCHABLE_BUSINESS_FIELDS:
+        if isinstance(business_input.get(field), str):
+            business_input[field] = normalize_search_text(business_input[field])
 
 
 def generate_slug(text: str) -> str:
     """生成URL友好的slug"""
-    # 将中文转换为拼音（简化处理）
-    import unicodedata
-    
     # 移除特殊字符，保留中文、字母、数字和空格
-    text = re.sub(r'[^\u4e00-\u9fa5a-zA-Z0-9\s-]', '', text)
+    text = _SLUG_STRIP.sub('', text)
     
     # 将空格替换为连字符
-    text = re.sub(r'\s+', '-', text.strip())
+    text = _SLUG_WS.sub('-', text.strip())
     
     # 限制长度
     if len(text) > 50:
@@ -101,8 +127,8 @@ class Config:
         extra = "allow"
 
 
-class ProjectResponse(BaseModel):
-    """项目响应模型"""
+class ProjectSummaryResponse(BaseModel):
+    """项目摘要响应模型（不含业务输入与技术规格）"""
     id: str
     title: str
     slug: str
@@ -112,16 +138,28 @@ class ProjectResponse(BaseModel):
     priority: str
     deadline: Optional[datetime]
     creator_id: Optional[str]
-    business_input: BusinessInput
-    technical_specs: TechnicalSpecs
     progress: dict
     created_at: datetime
     updated_at: datetime
 
+    class Config:
+        # 直接从 ORM 对象或查询行校验
+        from_attributes = True
+
+
+class ProjectResponse(ProjectSummaryResponse):
+    """项目响应模型"""
+    business_input: BusinessInput
+    technical_specs: TechnicalSpecs
+
+
+# 摘要列表只查询摘要字段对应的列，不从数据库传输 JSON 大字段
+_PROJECT_SUMMARY_COLUMNS = tuple(getattr(Project, name) for name in ProjectSummaryResponse.model_fields)
+
 
 class ProjectListResponse(BaseModel):
     """项目列表响应模型"""
-    data: List[ProjectResponse]
+    data: List[Union[ProjectResponse, ProjectSummaryResponse]]
     total: int
     page: int
     limit: int
@@ -150,23 +188,19 @@ async def create_project(
             "project_type": project_data.project_type,
             "priority": project_data.priority,
             "deadline": project_data.deadline,
-            "business_input": project_data.business_input.dict(),
-            "technical_specs": project_data.technical_specs.dict()
+            "business_input": project_data.business_input.model_dump(),
+            "technical_specs": project_data.technical_specs.model_dump()
         }
 
         # 使用综合验证器验证所有数据
         validated_data = validate_project_creation_data(validation_data)
+        _normalize_searchable_fields(validated_data)
 
         # 创建项目
         project_id = str(uuid4())
 
-        # 生成slug
-        base_slug = generate_slug(validated_data["title"])
-        slug = base_slug
-
-        # 确保slug唯一性（简单处理，添加时间戳）
-        import time
-        slug = f"{base_slug}-{int(time.time())}"
+        # 生成slug，以项目ID片段作后缀保证唯一（同一秒内的并发创建也不会冲突）
+        slug = f"{generate_slug(validated_data['title'])}-{project_id[:8]}"
 
         project = Project(
             id=project_id,
@@ -201,28 +235,13 @@ async def create_project(
             }
         )
 
+        # 列默认值在 Python 端生成，提交后对象已完整，无需 refresh
         db.add(project)
         await db.commit()
-        await db.refresh(project)
 
         logger.info(f"✅ 项目创建成功: {project.title} (ID: {project.id})")
 
-        return ProjectResponse(
-            id=project.id,
-            title=project.title,
-            slug=project.slug,
-            description=project.description,
-            status=project.status,
-            project_type=project.project_type,
-            priority=project.priority,
-            deadline=project.deadline,
-            creator_id=project.creator_id,
-            business_input=BusinessInput(**project.business_input),
-            technical_specs=TechnicalSpecs(**project.technical_specs),
-            progress=project.progress,
-            created_at=project.created_at,
-            updated_at=project.updated_at
-        )
+        return ProjectResponse.model_validate(project)
 
     except ValidationError as e:
         logger.warning(f"❌ 项目创建验证失败: {e.message}")
@@ -244,6 +263,7 @@ async def get_projects(
     limit: int = Query(20, ge=1, le=100, description="每页数量"),
     sort_by: str = Query("created_at", description="排序字段"),
     sort_order: str = Query("desc", description="排序方向"),
+    summary: bool = Query(False, description="仅返回摘要字段（不含业务输入与技术规格）"),
     current_user: User = Depends(require_project_read),
     db: AsyncSession = Depends(get_db)
 ):
@@ -258,7 +278,10 @@ async def get_projects(
         from sqlalchemy.orm import selectinload
 
         # 基础查询 - 添加用户权限过滤
-        query = select(Project).options(selectinload(Project.creator))
+        if summary:
+            query = select(*_PROJECT_SUMMARY_COLUMNS)
+        else:
+            query = select(Project).options(selectinload(Project.creator))
 
         # 如果不是管理员，只显示用户自己的项目或用户有权限访问的项目
         from app.core.permissions import permission_service
@@ -280,21 +303,25 @@ async def get_projects(
         # 平台过滤 - 从business_input中提取
         if platform_target:
             query = query.where(
-                Project.business_input["platform_target"].astext == platform_target.value
+                Project.business_input["platform_target"].as_string() == platform_target.value
             )
 
-        # 中文搜索支持
+        # 中文搜索支持（各列均有 pg_trgm / pg_bigm GIN 索引，LIKE 与 ILIKE 均可走索引）
         if search:
+            search = normalize_search_text(search)
             search_term = f"%{search}%"
-            query = query.where(
-                or_(
-                    Project.title.ilike(search_term),
-                    Project.description.ilike(search_term),
-                    Project.business_input["target_audience"].astext.ilike(search_term),
-                    Project.business_input["key_message"].astext.ilike(search_term),
-                    Project.business_input["brand_voice"].astext.ilike(search_term)
-                )
+            columns = (
+                Project.title,
+                Project.description,
+                Project.business_input["target_audience"].as_string(),
+                Project.business_input["key_message"].as_string(),
+                Project.business_input["brand_voice"].as_string()
             )
+            # 含中日韩字符时大小写无意义，使用区分大小写的 LIKE
+            if _CJK_PATTERN.search(search):
+                query = query.where(or_(*(column.like(search_term) for column in columns)))
+            else:
+                query = query.where(or_(*(column.ilike(search_term) for column in columns)))
 
         # 排序
         if sort_order == "desc":
@@ -302,40 +329,29 @@ async def get_projects(
         else:
             query = query.order_by(getattr(Project, sort_by).asc())
 
-        # 分页
-        total_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(total_query)
-        total = total_result.scalar()
-
-        # 分页查询
+        # 分页查询，总数通过窗口函数随当前页一并返回，过滤条件只执行一次
         offset = (page - 1) * limit
-        query = query.offset(offset).limit(limit)
+        result = await db.execute(
+            query.add_columns(func.count().over().label("total")).offset(offset).limit(limit)
+        )
+        rows = result.all()
+        if summary:
+            projects = [ProjectSummaryResponse.model_validate(row._mapping) for row in rows]
+        else:
+            projects = [ProjectResponse.model_validate(row[0]) for row in rows]
 
-        result = await db.execute(query)
-        projects = result.scalars().all()
+        if rows:
+            total = rows[0].total
+        elif offset:
+            # 超出最后一页时没有行可携带总数，单独计数
+            total = await db.scalar(select(func.count()).select_from(query.subquery()))
+        else:
+            total = 0
 
         logger.info(f"✅ 项目列表查询成功: {len(projects)} 个项目，总计 {total}")
 
         return ProjectListResponse(
-            data=[
-                ProjectResponse(
-                    id=p.id,
-                    title=p.title,
-                    slug=p.slug,
-                    description=p.description,
-                    status=p.status,
-                    project_type=p.project_type,
-                    priority=p.priority,
-                    deadline=p.deadline,
-                    creator_id=p.creator_id,
-                    business_input=BusinessInput(**p.business_input),
-                    technical_specs=TechnicalSpecs(**p.technical_specs),
-                    progress=p.progress,
-                    created_at=p.created_at,
-                    updated_at=p.updated_at
-                )
-                for p in projects
-            ],
+            data=projects,
             total=total,
             page=page,
             limit=limit,
@@ -363,9 +379,9 @@ async def get_project(
     """
     try:
         from sqlalchemy import select
-        from sqlalchemy.orm import selectinload
 
-        query = select(Project).options(selectinload(Project.creator)).where(Project.id == project_id)
+        # 响应不包含创建者信息，无需加载 creator 关系
+        query = select(Project).where(Project.id == project_id)
         result = await db.execute(query)
         project = result.scalar_one_or_none()
 
@@ -390,21 +406,7 @@ async def get_project(
 
         logger.info(f"✅ 项目详情查询成功: {project.title} (ID: {project.id})")
 
-        return ProjectResponse(
-            id=project.id,
-            title=project.title,
-            description=project.description,
-            status=project.status,
-            project_type=project.project_type,
-            priority=project.priority,
-            deadline=project.deadline,
-            creator_id=project.creator_id,
-            business_input=BusinessInput(**project.business_input),
-            technical_specs=TechnicalSpecs(**project.technical_specs),
-            progress=project.progress,
-            created_at=project.created_at,
-            updated_at=project.updated_at
-        )
+        return ProjectResponse.model_validate(project)
 
     except NotFoundError:
         raise
@@ -461,12 +463,13 @@ async def update_project(
             "project_type": project_data.project_type,
             "priority": project_data.priority,
             "deadline": project_data.deadline,
-            "business_input": project_data.business_input.dict(),
-            "technical_specs": project_data.technical_specs.dict()
+            "business_input": project_data.business_input.model_dump(),
+            "technical_specs": project_data.technical_specs.model_dump()
         }
 
         # 使用综合验证器验证所有数据
         validated_data = validate_project_creation_data(validation_data)
+        _normalize_searchable_fields(validated_data)
 
         # 更新字段
         project.title = validated_data["title"]
@@ -479,26 +482,10 @@ async def update_project(
         project.updated_at = datetime.utcnow()
 
         await db.commit()
-        await db.refresh(project)
 
         logger.info(f"✅ 项目更新成功: {project.title} (ID: {project.id})")
 
-        return ProjectResponse(
-            id=project.id,
-            title=project.title,
-            slug=project.slug,
-            description=project.description,
-            status=project.status,
-            project_type=project.project_type,
-            priority=project.priority,
-            deadline=project.deadline,
-            creator_id=project.creator_id,
-            business_input=BusinessInput(**project.business_input),
-            technical_specs=TechnicalSpecs(**project.technical_specs),
-            progress=project.progress,
-            created_at=project.created_at,
-            updated_at=project.updated_at
-        )
+        return ProjectResponse.model_validate(project)
 
     except ValidationError as e:
         logger.warning(f"❌ 项目更新验证失败: {e.message}")
@@ -525,14 +512,7 @@ async def delete_project(
     需要项目删除权限
     """
     try:
-        from sqlalchemy import select
-
-        query = select(Project).where(Project.id == project_id)
-        result = await db.execute(query)
-        project = result.scalar_one_or_none()
-
-        if not project:
-            raise NotFoundError("项目", project_id)
+        from sqlalchemy import update
 
         # 权限检查 - 确保用户有权限删除此项目
         from app.core.permissions import permission_service
@@ -550,11 +530,21 @@ async def delete_project(
                 details={"project_id": project_id, "user_id": current_user.id}
             )
 
-        # 软删除 - 更新状态而不是真正删除
-        project.status = ProjectStatus.ARCHIVED
+        # 软删除 - 单条 UPDATE 更新状态，无返回行即项目不存在
+        result = await db.execute(
+            update(Project)
+            .where(Project.id == project_id)
+            .values(status=ProjectStatus.ARCHIVED, updated_at=datetime.utcnow())
+            .returning(Project.title)
+        )
+        title = result.scalar_one_or_none()
+
+        if title is None:
+            raise NotFoundError("项目", project_id)
+
         await db.commit()
 
-        logger.info(f"✅ 项目归档成功: {project.title} (ID: {project.id})")
+        logger.info(f"✅ 项目归档成功: {title} (ID: {project_id})")
 
     except NotFoundError:
         raise
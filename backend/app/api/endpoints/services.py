@@ -6,8 +6,11 @@
 Manages AI services configuration, health checks, and statistics
 """
 
+import asyncio
 import logging
+from cachetools import TTLCache
 from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel, Field
 from typing import Dict, List, Optional, Any
 from datetime import datetime
@@ -28,7 +31,56 @@
 from app.utils.api_key_validator import api_key_validator
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(default_response_class=ORJSONResponse)
+
+# 健康检查/统计结果短时缓存，仪表盘轮询时多个请求共享一次远程探测
+PROBE_CACHE_TTL = 5
+_probe_cache: TTLCache = TTLCache(maxsize=8, ttl=PROBE_CACHE_TTL)
+_probe_lock = asyncio.Lock()
+
+# 各服务支持的模型（静态）
+SERVICE_MODELS = {
+    "deepseek": {
+        "text_generation": [
+            {"model": "deepseek-chat", "description": "DeepSeek对话模型", "max_tokens": 4000},
+            {"model": "deepseek-coder", "description": "DeepSeek代码模型", "max_tokens": 8000}
+        ]
+    },
+    "jimeng": {
+        "image_generation": [
+            {"model": "jimeng-4.0", "description": "即梦图像生成模型V4.0", "max_resolution": "1024x1024"},
+            {"model": "jimeng-3.5", "description": "即梦图像生成模型V3.5", "max_resolution": "512x512"}
+        ],
+        "video_generation": [
+            {"model": "jimeng-video-3.0", "description": "即梦视频生成模型V3.0", "max_duration": 30},
+            {"model": "jimeng-video-2.0", "description": "即梦视频生成模型V2.0", "max_duration": 15}
+        ],
+        "image_upscale": [
+            {"model": "jimeng-upscale-2.0", "description": "即梦图像增强模型", "max_scale": 4}
+        ]
+    }
+}
+
+# 根据配置过滤可用的模型，配置在进程启动时确定，模块加载时计算一次
+AVAILABLE_MODELS = {
+    name: models
+    for name, models in SERVICE_MODELS.items()
+    if (name == "deepseek" and settings.DEEPSEEK_API_KEY)
+    or (name == "jimeng" and settings.VOLC_ACCESS_KEY and settings.VOLC_SECRET_KEY)
+}
+
+
+async def _cached_probe(key: str, probe) -> Dict[str, Any]:
+    """执行远程探测并缓存结果；并发请求在锁内等待同一次探测"""
+    result = _probe_cache.get(key)
+    if result is not None:
+        return result
+    async with _probe_lock:
+        result = _probe_cache.get(key)
+        if result is None:
+            result = _probe_cache[key] = await probe()
+    return result
+
 
 # 服务管理模型
 class ServiceHealthResponse(BaseModel):
@@ -84,7 +136,7 @@ async def get_services_health():
     检查所有AI服务的配置状态和可用性
     """
     try:
-        health_status = await check_services_health()
+        health_status = await _cached_probe("health", check_services_health)
         logger.info(f"✅ 服务健康状态检查完成 - 状态: {health_status['overall_status']}")
         return ServiceHealthResponse(**health_status)
 
@@ -142,7 +194,7 @@ async def get_services_stats():
     包括使用统计、成功率等信息
     """
     try:
-        stats = await get_services_statistics()
+        stats = await _cached_probe("statistics", get_services_statistics)
         logger.info(f"✅ 服务统计信息获取完成 - 活跃服务: {stats['summary']['active_services']}")
         return ServiceStatisticsResponse(**stats)
 
@@ -264,36 +316,7 @@ async def get_available_models():
     返回各服务支持的模型和版本信息
     """
     try:
-        models = {
-            "deepseek": {
-                "text_generation": [
-                    {"model": "deepseek-chat", "description": "DeepSeek对话模型", "max_tokens": 4000},
-                    {"model": "deepseek-coder", "description": "DeepSeek代码模型", "max_tokens": 8000}
-                ]
-            },
-            "jimeng": {
-                "image_generation": [
-                    {"model": "jimeng-4.0", "description": "即梦图像生成模型V4.0", "max_resolution": "1024x1024"},
-                    {"model": "jimeng-3.5", "description": "即梦图像生成模型V3.5", "max_resolution": "512x512"}
-                ],
-                "video_generation": [
-                    {"model": "jimeng-video-3.0", "description": "即梦视频生成模型V3.0", "max_duration": 30},
-                    {"model": "jimeng-video-2.0", "description": "即梦视频生成模型V2.0", "max_duration": 15}
-                ],
-                "image_upscale": [
-                    {"model": "jimeng-upscale-2.0", "description": "即梦图像增强模型", "max_scale": 4}
-                ]
-            }
-        }
-
-        # 根据配置过滤可用的模型
-        available_models = {}
-
-        if settings.DEEPSEEK_API_KEY:
-            available_models["deepseek"] = models["deepseek"]
-
-        if settings.VOLC_ACCESS_KEY and settings.VOLC_SECRET_KEY:
-            available_models["jimeng"] = models["jimeng"]
+        available_models = AVAILABLE_MODELS
 
         logger.info(f"✅ 可用模型列表获取成功 - 服务数: {len(available_models)}")
 
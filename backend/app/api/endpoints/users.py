@@ -6,6 +6,7 @@
 Handles user profiles, preferences, security settings, etc.
 """
 
+import asyncio
 import logging
 from datetime import datetime
 from typing import Optional, Dict, Any, List
@@ -16,7 +17,9 @@
 from uuid import uuid4
 
 from app.core.database import get_db, PermissionResource, PermissionAction
-from app.core.security import get_current_user, hash_password, verify_password
+from app.core.security import (
+    get_current_user, hash_password, verify_password, invalidate_issued_tokens, invalidate_cached_user_id
+)
 from app.core.permissions import require_user_manage, require_admin, permission_service
 from app.models import User
 from app.core.exceptions import ValidationError, NotFoundError, PermissionDeniedError
@@ -228,6 +231,9 @@ async def update_user_profile(
                 values(**update_data, updated_at=datetime.utcnow())
             )
             await db.commit()
+            # 资料变更后缓存令牌中的用户名/邮箱声明已过时
+            invalidate_cached_user_id(str(current_user.id))
+            invalidate_issued_tokens(str(current_user.id))
 
             # 刷新用户信息
             await db.refresh(current_user)
@@ -258,22 +264,23 @@ async def change_password(
     需要验证当前密码，并确保新密码符合安全要求
     """
     try:
+        # 密码哈希计算在线程中执行，不阻塞事件循环
         # 验证当前密码
-        if not verify_password(password_data.current_password, current_user.hashed_password):
+        if not await asyncio.to_thread(verify_password, password_data.current_password, current_user.hashed_password):
             raise ValidationError(
                 "当前密码不正确",
                 details={"field": "current_password"}
             )
 
         # 检查新密码是否与当前密码相同
-        if verify_password(password_data.new_password, current_user.hashed_password):
+        if await asyncio.to_thread(verify_password, password_data.new_password, current_user.hashed_password):
             raise ValidationError(
                 "新密码不能与当前密码相同",
                 details={"field": "new_password"}
             )
 
         # 更新密码
-        new_hashed_password = hash_password(password_data.new_password)
+        new_hashed_password = await asyncio.to_thread(hash_password, password_data.new_password)
 
         from sqlalchemy import update
         await db.execute(
@@ -286,6 +293,10 @@ async def change_password(
         )
         await db.commit()
 
+        # 旧密码换取的缓存令牌与认证缓存不再复用
+        invalidate_issued_tokens(str(current_user.id))
+        invalidate_cached_user_id(str(current_user.id))
+
         logger.info(f"✅ 用户密码修改成功: {current_user.username}")
 
         return {
@@ -362,6 +373,7 @@ async def update_security_settings(
             )
         )
         await db.commit()
+        invalidate_cached_user_id(str(current_user.id))
 
         logger.info(f"✅ 用户安全设置更新成功: {current_user.username}")
         return security_settings
@@ -486,6 +498,7 @@ async def upload_avatar(
             )
         )
         await db.commit()
+        invalidate_cached_user_id(str(current_user.id))
 
         logger.info(f"✅ 用户头像上传成功: {current_user.username} - {file.filename}")
 
@@ -17,12 +17,8 @@
 # 创建主API路由器
 api_router = APIRouter()
 
-# 认证相关路由
-api_router.include_router(
-    auth_router,
-    prefix="/auth",
-    tags=["认证"]
-)
+# 认证相关路由（前缀与标签在路由器上定义）
+api_router.include_router(auth_router)
 
 # 项目管理相关路由
 api_router.include_router(
@@ -31,12 +27,8 @@
     tags=["项目管理"]
 )
 
-# AI内容生成相关路由
-api_router.include_router(
-    ai_router,
-    prefix="/ai",
-    tags=["AI内容生成"]
-)
+# AI内容生成相关路由（前缀与标签在路由器上定义）
+api_router.include_router(ai_router)
 
 # 媒体资源相关路由
 api_router.include_router(
@@ -43,6 +43,10 @@ class Settings(BaseSettings):
     JWT_EXPIRATION_MINUTES: int = int(os.getenv("JWT_EXPIRATION_MINUTES", "1440"))
     JWT_REFRESH_EXPIRATION_DAYS: int = int(os.getenv("JWT_REFRESH_EXPIRATION_DAYS", "7"))
 
+    # 登录限流：每个 (IP, 账号) 在时间窗口内允许的尝试次数
+    LOGIN_RATE_LIMIT: int = int(os.getenv("LOGIN_RATE_LIMIT", "5"))
+    LOGIN_RATE_LIMIT_WINDOW: int = int(os.getenv("LOGIN_RATE_LIMIT_WINDOW", "60"))
+
     # CORS配置 - 针对中国环境优化
     ALLOWED_ORIGINS: List[str] = [
         "http://localhost:3000",
@@ -61,12 +65,14 @@ class Settings(BaseSettings):
     DEEPSEEK_MODEL: str = os.getenv("DEEPSEEK_MODEL", "deepseek-chat")
     DEEPSEEK_MAX_TOKENS: int = int(os.getenv("DEEPSEEK_MAX_TOKENS", "4000"))
     DEEPSEEK_TEMPERATURE: float = float(os.getenv("DEEPSEEK_TEMPERATURE", "0.7"))
+    DEEPSEEK_CONCURRENCY: int = int(os.getenv("DEEPSEEK_CONCURRENCY", "20"))
 
     ## 即梦大模型配置 (火山引擎)
     VOLC_ACCESS_KEY: str = os.getenv("VOLC_ACCESS_KEY", "")
     VOLC_SECRET_KEY: str = os.getenv("VOLC_SECRET_KEY", "")
     VOLC_REGION: str = os.getenv("VOLC_REGION", "cn-north-1")
     JIMENG_BASE_URL: str = os.getenv("JIMENG_BASE_URL", "https://open-api.dreamina.com/v1")
+    JIMENG_CONCURRENCY: int = int(os.getenv("JIMENG_CONCURRENCY", "8"))
 
     ## AutoGen配置
     AUTOGEN_MODEL: str = os.getenv("AUTOGEN_MODEL", "gpt-4")
@@ -9,7 +9,8 @@
 
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from sqlalchemy import String, Integer, DateTime, Text, Boolean, ForeignKey, JSON, Enum as SQLEnum
+from sqlalchemy import String, Integer, DateTime, Text, Boolean, ForeignKey, JSON, Index, Enum as SQLEnum, text
+from sqlalchemy.dialects.postgresql import JSONB
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 import enum
@@ -126,6 +127,11 @@ class RoleType(str, enum.Enum):
 class User(Base):
     """用户模型 - 支持中国用户"""
     __tablename__ = "users"
+    __table_args__ = (
+        # 登录和注册按不区分大小写的邮箱/用户名查找
+        Index("ix_users_email_lower", text("lower(email)"), unique=True),
+        Index("ix_users_username_lower", text("lower(username)"), unique=True),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     username: Mapped[str] = mapped_column(String(50), unique=True, index=True)
@@ -323,6 +329,15 @@ class Storyboard(Base):
 class MediaAsset(Base):
     """媒体资源模型 - 图片、视频、音频等资源"""
     __tablename__ = "media_assets"
+    __table_args__ = (
+        # 资源列表按上传者过滤、(created_at, id) 游标分页
+        Index("ix_media_assets_uploaded_by_created_at_id", "uploaded_by", "created_at", "id"),
+        # 标签包含查询（@>）
+        Index(
+            "ix_media_assets_tags", "tags",
+            postgresql_using="gin", postgresql_ops={"tags": "jsonb_path_ops"}
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     project_id: Mapped[str] = mapped_column(String(36), ForeignKey("projects.id"), index=True)
@@ -333,14 +348,17 @@ class MediaAsset(Base):
     file_url: Mapped[str] = mapped_column(String(500))
     file_size: Mapped[Optional[int]] = mapped_column(Integer)
     mime_type: Mapped[str] = mapped_column(String(100))
+    checksum: Mapped[Optional[str]] = mapped_column(String(64))  # SHA-256，用于完整性校验
+    weak_checksum: Mapped[Optional[str]] = mapped_column(String(32), index=True)  # 大小+首尾采样的xxh3_128指纹，用于去重预筛
     
     # 元数据
     asset_metadata: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
-    tags: Mapped[List[str]] = mapped_column(JSON, default=list)
+    tags: Mapped[List[str]] = mapped_column(JSON().with_variant(JSONB, "postgresql"), default=list)
     
     # 来源信息
     source: Mapped[str] = mapped_column(String(50), default="upload")  # upload, ai_generated, external
     ai_model: Mapped[Optional[str]] = mapped_column(String(100))
+    uploaded_by: Mapped[Optional[str]] = mapped_column(String(36), ForeignKey("users.id"))
     
     # 状态
     status: Mapped[str] = mapped_column(String(20), default="active")
@@ -351,6 +369,19 @@ class MediaAsset(Base):
     # 关系
     project: Mapped["Project"] = relationship("Project", back_populates="media_assets")
 
+    # 上传时写入元数据的文件信息 / File details stored in asset_metadata at upload time
+    @property
+    def original_filename(self) -> str:
+        return (self.asset_metadata or {}).get("original_filename") or self.name
+
+    @property
+    def thumbnail_url(self) -> Optional[str]:
+        return (self.asset_metadata or {}).get("thumbnail_url")
+
+    @property
+    def technical_specs(self) -> Dict[str, Any]:
+        return (self.asset_metadata or {}).get("technical_specs") or {}
+
 
 # 最终视频模型
 class FinalVideo(Base):
@@ -395,6 +426,13 @@ class FinalVideo(Base):
 class Permission(Base):
     """权限模型 - 细粒度权限定义"""
     __tablename__ = "permissions"
+    __table_args__ = (
+        # 权限列表按 (category, name) 排序，过滤列放入 INCLUDE 以便仅索引扫描
+        Index(
+            "ix_permissions_category_name", "category", "name",
+            postgresql_include=["resource", "action", "is_system"]
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     name: Mapped[str] = mapped_column(String(100), unique=True, index=True)
@@ -420,6 +458,13 @@ class Permission(Base):
 class Role(Base):
     """角色模型 - 支持角色继承和层级结构"""
     __tablename__ = "roles"
+    __table_args__ = (
+        # 角色列表按 (level, name) 排序，过滤列放入 INCLUDE 以便仅索引扫描
+        Index(
+            "ix_roles_level_name", "level", "name",
+            postgresql_include=["role_type", "organization_id", "is_active", "is_system"]
+        ),
+    )
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True)
     name: Mapped[str] = mapped_column(String(100), unique=True, index=True)
@@ -12,7 +12,6 @@
 from datetime import datetime
 
 from fastapi import Depends, HTTPException, status
-from fastapi.security import HTTPBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.database import get_db, PermissionResource, PermissionAction
@@ -165,18 +164,19 @@ def __init__(self, allowed_roles: List[str]):
             allowed_roles: 允许的角色列表
         """
         self.allowed_roles = allowed_roles
+        self._allowed_role_set = frozenset(allowed_roles)
 
     async def __call__(
         self,
-        current_user: User = Depends(get_current_user),
-        db: AsyncSession = Depends(get_db)
+        current_user: User = Depends(get_current_user)
     ) -> User:
         """
         执行角色检查
 
+        角色取自当前用户（令牌缓存命中时无需数据库），不再单独依赖数据库会话
+
         Args:
             current_user: 当前用户
-            db: 数据库会话
 
         Returns:
             用户对象（如果检查通过）
@@ -185,7 +185,7 @@ async def __call__(
             PermissionDeniedError: 如果角色不允许
         """
         # 这里使用向后兼容的方式，检查用户角色
-        if current_user.role not in self.allowed_roles:
+        if current_user.role not in self._allowed_role_set:
             raise PermissionDeniedError(
                 f"权限不足 - 需要角色: {', '.join(self.allowed_roles)}, "
                 f"当前角色: {current_user.role}",
@@ -6,23 +6,112 @@
 """
 
 import jwt
+import copy
+import time
+import asyncio
+import hashlib
+import secrets
 import logging
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, NamedTuple, Tuple
+from cachetools import TTLCache
 from passlib.context import CryptContext
-from fastapi import HTTPException, status, Depends
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from fastapi import HTTPException, status, Depends, Header
+from sqlalchemy import bindparam, select, inspect as sa_inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.core.database import get_db
 from app.models import User
 
-# 密码上下文配置 / Password context configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# 密码上下文配置：新哈希使用Argon2id，已有bcrypt哈希在下次登录时迁移
+# Password context: new hashes use Argon2id, existing bcrypt hashes migrate on next login
+pwd_context = CryptContext(schemes=["argon2", "bcrypt"], deprecated="auto")
 
-# HTTP认证方案 / HTTP authentication scheme
-security = HTTPBearer()
+# 用户不存在时用于等时验证的占位哈希（随机密码，不可能匹配）
+# Placeholder hash verified when the user does not exist (random password, never matches)
+DUMMY_PASSWORD_HASH = pwd_context.hash(secrets.token_urlsafe(32))
+
+# 按ID查询用户的预构建语句 / Prebuilt statement for loading a user by id
+_SELECT_USER_BY_ID = select(User).where(User.id == bindparam("user_id"))
+
+# 用户表的列属性名，用于缓存列快照 / Column attribute names of User, used for cached snapshots
+_USER_COLUMNS = tuple(attr.key for attr in sa_inspect(User).column_attrs)
+
+
+class _CachedAuth(NamedTuple):
+    """已验证令牌的缓存条目（列快照而非ORM对象）/ Cached entry for a verified token (column snapshot, no ORM object)"""
+    user_id: str
+    exp: float
+    columns: Dict[str, Any]
+
+
+# 已验证令牌的本地缓存，按令牌哈希索引；命中时跳过JWT解码验证和用户查询
+# 用户资料、密码或角色变更时由 invalidate_cached_user_id 清除，其余情况由TTL限制过期时间
+# Verified-token cache keyed by token hash; a hit skips both JWT decoding and the user query.
+# Profile, password and role changes evict via invalidate_cached_user_id; the TTL bounds everything else
+_user_cache: TTLCache = TTLCache(maxsize=50_000, ttl=60)
+
+# 近期签发的令牌缓存，按 (用户ID, 角色) 索引；有效期远小于令牌有效期，缓存值为 (令牌, 过期时间戳)
+# Recently issued tokens keyed by (user id, role); value is (tokens, access token exp timestamp)
+_issued_token_cache: TTLCache = TTLCache(maxsize=10_000, ttl=15)
+
+# 近期验证通过的登录密码，键包含存储的哈希，修改密码后自动失效
+# Recently verified login passwords; the key includes the stored hash so a password change invalidates it
+_verified_password_cache: TTLCache = TTLCache(maxsize=10_000, ttl=10)
+
+
+def _token_cache_key(token: str) -> bytes:
+    """令牌缓存键，避免在内存中以明文令牌作为键 / Cache key that avoids keeping raw tokens as keys"""
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def _snapshot_user(user: User) -> Dict[str, Any]:
+    """复制用户的列值（JSON列深拷贝，请求内修改不影响缓存）/ Copy column values; JSON columns are deep-copied"""
+    return {key: copy.deepcopy(getattr(user, key)) for key in _USER_COLUMNS}
+
+
+def _rehydrate_user(columns: Dict[str, Any]) -> User:
+    """由列快照构造已分离的用户对象，无需查询 / Build a detached user from a snapshot without a query"""
+    user = User(**copy.deepcopy(columns))
+    make_transient_to_detached(user)
+    return user
+
+
+def invalidate_cached_user(token: str) -> None:
+    """
+    使令牌对应的用户缓存失效
+    Evict the cached user for a token
+
+    Args:
+        token: JWT访问令牌 / JWT access token
+    """
+    _user_cache.pop(_token_cache_key(token), None)
+
+
+def invalidate_cached_user_id(user_id: str) -> None:
+    """
+    清除用户所有令牌的认证缓存（修改密码、资料或角色时调用）
+    Evict every cached token entry for a user (on password, profile or role changes)
+
+    Args:
+        user_id: 用户ID / User ID
+    """
+    for key in [key for key, entry in list(_user_cache.items()) if entry.user_id == user_id]:
+        _user_cache.pop(key, None)
+
+
+def invalidate_issued_tokens(user_id: str) -> None:
+    """
+    清除为用户缓存的已签发令牌（登出、修改密码时调用）
+    Drop the cached issued tokens for a user (on logout or password change)
+
+    Args:
+        user_id: 用户ID / User ID
+    """
+    for key in [key for key in _issued_token_cache if key[0] == user_id]:
+        _issued_token_cache.pop(key, None)
 
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
@@ -139,16 +228,75 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+async def verify_login_password(user_id: str, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    验证登录密码，短时间内重复登录跳过哈希计算，旧哈希验证通过后返回迁移后的新哈希
+    Verify a login password, skipping the hash for repeat logins and returning a rehash for deprecated schemes
+
+    Args:
+        user_id: 用户ID / User ID
+        plain_password: 明文密码 / Plain text password
+        hashed_password: 存储的哈希密码 / Stored password hash
+
+    Returns:
+        (密码是否匹配, 需要保存的新哈希或None) / (whether it matches, new hash to store or None)
+    """
+    # 带密钥的摘要，缓存中不保留可离线破解的密码指纹
+    # Keyed digest so the cache holds nothing that can be brute-forced offline
+    password_digest = hashlib.blake2b(
+        plain_password.encode(), key=settings.JWT_SECRET_KEY.encode()[:64], digest_size=16
+    ).digest()
+    cache_key = (user_id, hashed_password, password_digest)
+    if cache_key in _verified_password_cache:
+        return True, None
+
+    # 哈希计算在线程中执行（bcrypt/argon2均释放GIL），不阻塞事件循环
+    # Hashing runs in a thread (bcrypt and argon2 release the GIL) to keep the event loop free
+    verified, new_hash = await asyncio.to_thread(pwd_context.verify_and_update, plain_password, hashed_password)
+    if verified:
+        _verified_password_cache[(user_id, new_hash or hashed_password, password_digest)] = True
+    return verified, new_hash
+
+
+# OpenAPI中的Bearer认证方案；请求时由 get_bearer_token 直接解析请求头，由应用的 openapi() 挂到需要认证的接口上
+# Bearer scheme for OpenAPI only; requests are parsed by get_bearer_token, the app's openapi() attaches it to routes
+BEARER_SCHEME_NAME = "BearerAuth"
+BEARER_SCHEME = {"type": "http", "scheme": "bearer", "bearerFormat": "JWT"}
+
+
+def get_bearer_token(authorization: Optional[str] = Header(None, include_in_schema=False)) -> str:
+    """
+    从Authorization请求头中直接解析Bearer令牌
+    Parse the Bearer token straight from the Authorization header
+
+    Args:
+        authorization: Authorization请求头 / Authorization header
+
+    Returns:
+        令牌字符串 / Token string
+
+    Raises:
+        HTTPException: 如果请求头缺失或格式错误 / If the header is missing or malformed
+    """
+    if not authorization or authorization[:7].lower() != "bearer " or not authorization[7:].strip():
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="未提供认证凭据 / Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return authorization[7:].strip()
+
+
 async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    token: str = Depends(get_bearer_token),
+    db: AsyncSession = Depends(get_db)
 ) -> User:
     """
     获取当前用户
     Get current user
 
     Args:
-        credentials: HTTP认证凭据 / HTTP authorization credentials
+        token: Bearer令牌 / Bearer token
         db: 数据库会话 / Database session
 
     Returns:
@@ -157,7 +305,13 @@ async def get_current_user(
     Raises:
         HTTPException: 如果认证失败 / If authentication fails
     """
-    token = credentials.credentials
+    # 命中缓存且令牌未过期时跳过令牌验证与用户查询，用户对象并入当前会话（不发出SELECT）
+    # On a valid cache hit skip verification and the user query; merge the user into the session without a SELECT
+    cache_key = _token_cache_key(token)
+    cached: Optional[_CachedAuth] = _user_cache.get(cache_key)
+    if cached is not None and time.time() < cached.exp:
+        return await db.merge(_rehydrate_user(cached.columns), load=False)
+
     payload = verify_token(token)
 
     if payload is None:
@@ -174,9 +328,10 @@ async def get_current_user(
             detail="无效的用户ID / Invalid user ID",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    exp = payload.get("exp")
 
     # 查询用户 / Query user
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await db.get(User, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -189,6 +344,8 @@ async def get_current_user(
             detail="用户账户未激活 / User account is not active"
         )
 
+    if exp is not None:
+        _user_cache[cache_key] = _CachedAuth(str(user.id), exp, _snapshot_user(user))
     return user
 
 
@@ -252,6 +409,16 @@ def create_tokens_for_user(user: User) -> Dict[str, str]:
     Returns:
         包含访问和刷新令牌的字典 / Dictionary containing access and refresh tokens
     """
+    # 短时间内重复签发时复用缓存的令牌，跳过签名计算
+    # Reuse tokens issued moments ago instead of signing again
+    cache_key = (str(user.id), user.role)
+    cached = _issued_token_cache.get(cache_key)
+    if cached is not None:
+        tokens, expires_at = cached
+        # 剩余有效期按缓存令牌的过期时间计算 / Remaining lifetime follows the cached token's exp
+        return {**tokens, "expires_in": max(0, int(expires_at - time.time()))}
+
+    expires_at = time.time() + settings.JWT_EXPIRATION_MINUTES * 60
     token_data = {
         "sub": str(user.id),
         "username": user.username,
@@ -262,15 +429,17 @@ def create_tokens_for_user(user: User) -> Dict[str, str]:
     access_token = create_access_token(token_data)
     refresh_token = create_refresh_token(token_data)
 
-    return {
+    tokens = {
         "access_token": access_token,
         "refresh_token": refresh_token,
         "token_type": "Bearer",
         "expires_in": settings.JWT_EXPIRATION_MINUTES * 60
     }
+    _issued_token_cache[cache_key] = (tokens, expires_at)
+    return tokens
 
 
-async def refresh_access_token(refresh_token: str, db: Session) -> Optional[Dict[str, str]]:
+async def refresh_access_token(refresh_token: str, db: AsyncSession) -> Optional[Dict[str, str]]:
     """
     使用刷新令牌获取新的访问令牌
     Get new access token using refresh token
@@ -292,7 +461,8 @@ async def refresh_access_token(refresh_token: str, db: Session) -> Optional[Dict
         return None
 
     # 验证用户仍然存在 / Verify user still exists
-    user = db.query(User).filter(User.id == user_id).first()
+    result = await db.execute(_SELECT_USER_BY_ID, {"user_id": user_id})
+    user = result.scalar_one_or_none()
     if user is None or not user.is_active:
         return None
 
@@ -328,4 +498,4 @@ def validate_token_data(token_data: Dict[str, Any]) -> bool:
 
 # 日志配置 / Logging configuration
 logger = logging.getLogger(__name__)
-logger.info("✅ 安全模块加载完成 - JWT认证和密码哈希已就绪")
\ No newline at end of file
+logger.debug("✅ 安全模块加载完成 - JWT认证和密码哈希已就绪")
\ No newline at end of file
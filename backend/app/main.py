@@ -10,7 +10,11 @@
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from fastapi.openapi.utils import get_openapi
+from fastapi.dependencies.utils import get_flat_dependant
 from contextlib import asynccontextmanager
+from concurrent.futures import ProcessPoolExecutor
 import uvicorn
 from loguru import logger
 
@@ -19,6 +23,7 @@
 from app.core.database import init_redis
 from app.api.routes import api_router
 from app.core.exceptions import setup_exception_handlers
+from app.core.security import BEARER_SCHEME, BEARER_SCHEME_NAME, get_bearer_token
 
 
 @asynccontextmanager
@@ -38,9 +43,13 @@ async def lifespan(app: FastAPI):
     logger.info("🤖 初始化中国AI服务...")
     # 这里将初始化DeepSeek和即梦大模型服务
 
+    # 图片解码等CPU密集任务使用进程池，不受GIL限制
+    app.state.media_process_pool = ProcessPoolExecutor()
+
     yield
 
     logger.info("🛑 关闭系统服务...")
+    app.state.media_process_pool.shutdown(wait=False, cancel_futures=True)
 
 
 def create_app() -> FastAPI:
@@ -64,6 +73,9 @@ def create_app() -> FastAPI:
     # 注册路由
     app.include_router(api_router, prefix="/api/v1")
 
+    # 在OpenAPI中声明Bearer认证
+    setup_openapi_security(app)
+
     # 健康检查端点
     @app.get("/health")
     async def health_check():
@@ -82,6 +94,39 @@ async def health_check():
     return app
 
 
+def setup_openapi_security(app: FastAPI) -> None:
+    """在OpenAPI文档中声明Bearer认证方案，并标注依赖令牌解析的接口"""
+
+    def custom_openapi():
+        if app.openapi_schema:
+            return app.openapi_schema
+
+        schema = get_openapi(
+            title=app.title,
+            version=app.version,
+            description=app.description,
+            routes=app.routes,
+        )
+        schema.setdefault("components", {}).setdefault("securitySchemes", {})[BEARER_SCHEME_NAME] = BEARER_SCHEME
+
+        for route in app.routes:
+            if not isinstance(route, APIRoute) or not route.include_in_schema:
+                continue
+            dependencies = get_flat_dependant(route.dependant).dependencies
+            if not any(dependency.call is get_bearer_token for dependency in dependencies):
+                continue
+            operations = schema["paths"].get(route.path_format, {})
+            for method in route.methods:
+                operation = operations.get(method.lower())
+                if operation is not None:
+                    operation["security"] = [{BEARER_SCHEME_NAME: []}]
+
+        app.openapi_schema = schema
+        return schema
+
+    app.openapi = custom_openapi
+
+
 def setup_middleware(app: FastAPI) -> None:
     """配置中间件"""
 
@@ -14,6 +14,8 @@
 from uuid import uuid4
 from dataclasses import dataclass, asdict
 from enum import Enum
+from itertools import islice
+from collections import defaultdict
 
 from autogen import AssistantAgent, UserProxyAgent, GroupChat, GroupChatManager
 from autogen.agentchat.contrib.math_user_proxy_agent import MathUserProxyAgent
@@ -210,6 +212,10 @@ def __init__(self):
         self.agents = {}
         self.active_tasks: Dict[str, Task] = {}
         self.task_callbacks: Dict[str, Callable] = {}
+        # 持有后台执行协程的强引用，防止被垃圾回收，并支持真正的取消
+        self._running_tasks: Dict[str, asyncio.Task] = {}
+        # 按项目索引任务ID（保持创建顺序），按项目查询时无需扫描全部任务
+        self._by_project: Dict[str, List[str]] = defaultdict(list)
         self._initialize_agents()
 
     def _initialize_agents(self):
@@ -262,21 +268,24 @@ async def create_task(
         )
 
         self.active_tasks[task_id] = task
+        self._by_project[project_id].append(task_id)
 
         if callback:
             self.task_callbacks[task_id] = callback
 
         logger.info(f"📝 创建任务成功 - ID: {task_id}, 类型: {task_type.value}")
 
-        # 立即开始执行任务
-        asyncio.create_task(self._execute_task(task_id))
+        # 立即在后台开始执行任务（fire-and-forget），调用方无需等待执行
+        running = asyncio.create_task(self._execute_task(task_id))
+        self._running_tasks[task_id] = running
+        running.add_done_callback(lambda _: self._running_tasks.pop(task_id, None))
 
         return task_id
 
     async def _execute_task(self, task_id: str):
         """执行具体任务"""
         task = self.active_tasks.get(task_id)
-        if not task:
+        if not task or task.status == TaskStatus.CANCELLED:
             return
 
         try:
@@ -436,13 +445,46 @@ def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
             "error": task.error
         }
 
-    def get_active_tasks(self) -> List[Dict[str, Any]]:
-        """获取所有活跃任务"""
+    def get_task_statuses(self, task_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """批量获取任务状态，未找到的任务返回None"""
+        return {task_id: self.get_task_status(task_id) for task_id in task_ids}
+
+    def _iter_task_ids(self, project_id: Optional[str] = None, status: Optional[str] = None):
+        """按项目和状态筛选任务ID"""
+        if project_id is None:
+            task_ids = self.active_tasks.keys()
+        else:
+            task_ids = self._by_project.get(project_id, ())
+
+        if status is None:
+            return iter(task_ids)
+        return (
+            task_id for task_id in task_ids
+            if self.active_tasks[task_id].status.value == status
+        )
+
+    def get_active_tasks(
+        self,
+        limit: Optional[int] = None,
+        offset: int = 0,
+        project_id: Optional[str] = None,
+        status: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """获取活跃任务，支持按项目/状态筛选和分页"""
+        stop = offset + limit if limit is not None else None
         return [
             self.get_task_status(task_id)
-            for task_id in self.active_tasks.keys()
+            for task_id in islice(self._iter_task_ids(project_id, status), offset, stop)
         ]
 
+    def count_active_tasks(self, project_id: Optional[str] = None, status: Optional[str] = None) -> int:
+        """获取活跃任务数量，无需构建任务列表"""
+        if status is None:
+            if project_id is None:
+                return len(self.active_tasks)
+            return len(self._by_project.get(project_id, ()))
+        return sum(1 for _ in self._iter_task_ids(project_id, status))
+
     async def cancel_task(self, task_id: str) -> bool:
         """取消任务"""
         task = self.active_tasks.get(task_id)
@@ -455,6 +497,11 @@ async def cancel_task(self, task_id: str) -> bool:
         task.status = TaskStatus.CANCELLED
         task.completed_at = datetime.now()
 
+        # 取消仍在运行的后台执行
+        running = self._running_tasks.get(task_id)
+        if running and not running.done():
+            running.cancel()
+
         logger.info(f"🛑 任务已取消 - ID: {task_id}")
         return True
 
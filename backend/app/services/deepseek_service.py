@@ -26,6 +26,8 @@ def __init__(self):
         self.api_key = settings.DEEPSEEK_API_KEY
         self.base_url = settings.DEEPSEEK_BASE_URL
         self.timeout = 30.0
+        # 限制并发上游请求数，避免突发流量触发限流(429)
+        self._semaphore = asyncio.Semaphore(settings.DEEPSEEK_CONCURRENCY)
 
         if not self.api_key:
             logger.warning("DeepSeek API key not configured")
@@ -57,26 +59,11 @@ async def generate_concept(
             生成的创意概念内容
         """
         try:
-            # 构建系统提示词
-            system_prompt = self._build_concept_system_prompt(platform_target)
-
-            # 构建用户提示词
-            user_prompt = f"""
-            创作需求：{prompt}
+            # 构建系统提示词 - 同一项目内稳定不变，作为DeepSeek上下文缓存的公共前缀
+            system_prompt = self._build_concept_system_prompt(platform_target, cultural_context)
 
-            文化背景：{cultural_context}
-
-            请基于以上信息，创作一个适合{platform_target}平台的中文创意概念，包含：
-            1. 核心创意主题 (简洁有力，易于传播)
-            2. 情感共鸣点 (触动目标受众)
-            3. 视觉风格建议 (适合短视频表现)
-            4. 传播策略要点 (符合平台算法偏好)
-
-            要求：
-            - 内容必须原创，符合中国文化背景
-            - 语言生动活泼，适合短视频传播
-            - 考虑目标平台的用户习惯和算法特点
-            """
+            # 构建用户提示词 - 仅包含每次变化的创作需求
+            user_prompt = f"创作需求：{prompt}"
 
             # 调用DeepSeek API
             response = await self._call_deepseek_api(
@@ -272,7 +259,7 @@ async def _call_deepseek_api(
             "stream": False
         }
 
-        async with httpx.AsyncClient(timeout=self.timeout) as client:
+        async with self._semaphore, httpx.AsyncClient(timeout=self.timeout) as client:
             response = await client.post(
                 f"{self.base_url}/chat/completions",
                 headers=headers,
@@ -285,8 +272,13 @@ async def _call_deepseek_api(
             result = response.json()
             return result["choices"][0]["message"]["content"]
 
-    def _build_concept_system_prompt(self, platform: str) -> str:
-        """构建创意概念系统提示词"""
+    def _build_concept_system_prompt(self, platform: str, cultural_context: str) -> str:
+        """
+        构建创意概念系统提示词
+
+        DeepSeek按消息前缀自动命中上下文缓存，因此平台说明、文化背景和输出要求
+        都放在系统提示词中，动态的创作需求放在最后的用户消息里
+        """
         platform_insights = {
             "douyin": "抖音用户喜欢新鲜、有趣、易于模仿的内容，算法偏好高完播率和互动率",
             "wechat": "微信视频号用户更注重内容质量和社交价值，适合深度和有价值的内容",
@@ -303,6 +295,19 @@ def _build_concept_system_prompt(self, platform: str) -> str:
 
         你的任务是创作符合中国文化背景、适合{platform}平台传播的优质创意概念。
         创意必须原创、有趣、易于病毒式传播，同时符合中国法律法规和社会价值观。
+
+        文化背景：{cultural_context}
+
+        请基于用户给出的创作需求和以上文化背景，创作一个适合{platform}平台的中文创意概念，包含：
+        1. 核心创意主题 (简洁有力，易于传播)
+        2. 情感共鸣点 (触动目标受众)
+        3. 视觉风格建议 (适合短视频表现)
+        4. 传播策略要点 (符合平台算法偏好)
+
+        要求：
+        - 内容必须原创，符合中国文化背景
+        - 语言生动活泼，适合短视频传播
+        - 考虑目标平台的用户习惯和算法特点
         """
 
     def _build_script_system_prompt(self, tone: str, target_age_group: str) -> str:
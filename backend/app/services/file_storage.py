@@ -7,12 +7,15 @@
 """
 
 import os
+import shutil
 import logging
 import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, Optional, Tuple, Union
 from pathlib import Path
 
+import aiofiles
+
 from app.core.config import settings
 from app.core.exceptions import ValidationError
 
@@ -31,8 +34,107 @@
     PIL_AVAILABLE = False
     logging.warning("PIL库未安装，缩略图功能将不可用")
 
+try:
+    import imagesize
+    IMAGESIZE_AVAILABLE = True
+except ImportError:
+    IMAGESIZE_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# 超过该大小的文件使用OSS分片并发上传
+OSS_MULTIPART_THRESHOLD = 20 * 1024 * 1024  # 20MB
+OSS_MULTIPART_PART_SIZE = 8 * 1024 * 1024   # 8MB
+OSS_MULTIPART_THREADS = 8
+
+def _thumbnail_from_image(image, size: tuple, quality: int) -> Tuple[bytes, int, int]:
+    """
+    在已打开（尚未解码）的图片上生成JPEG缩略图
+
+    JPEG通过draft()在解码阶段直接按比例缩小，避免先解码全尺寸图片；
+    安装pillow-simd可进一步加速thumbnail()的重采样
+
+    Returns:
+        (缩略图内容, 宽度, 高度)
+    """
+    image.draft('RGB', size)
+
+    # 直接在解码后的图片上缩放，不额外复制
+    image.thumbnail(size, Image.Resampling.LANCZOS)
+
+    # 转换为RGB模式（如果是RGBA等模式）
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    thumbnail_buffer = io.BytesIO()
+    image.save(thumbnail_buffer, format='JPEG', quality=quality, optimize=True)
+    return thumbnail_buffer.getvalue(), image.width, image.height
+
+def _render_thumbnail(file_content: bytes, size: tuple, quality: int) -> Tuple[bytes, int, int]:
+    """解码图片并生成JPEG缩略图（同步执行，供线程池调用）"""
+    return _thumbnail_from_image(Image.open(io.BytesIO(file_content)), size, quality)
+
+def analyze_image(
+    file_content: bytes,
+    thumbnail_size: Optional[tuple] = (300, 300),
+    quality: int = 85
+) -> Tuple[Dict[str, Any], Optional[bytes]]:
+    """
+    一次打开图片，同时提取技术规格并生成缩略图（同步执行，可在进程池中调用）
+
+    Args:
+        file_content: 原始图片内容
+        thumbnail_size: 缩略图尺寸，为None时不生成缩略图
+        quality: 缩略图质量
+
+    Returns:
+        (技术规格, 缩略图内容)
+    """
+    image = Image.open(io.BytesIO(file_content))
+
+    # 规格取自文件头，需在draft()改变尺寸前读取
+    specs = {
+        "width": image.width,
+        "height": image.height,
+        "format": image.format,
+        "mode": image.mode,
+        "color_space": image.mode
+    }
+
+    thumbnail_content = None
+    if thumbnail_size:
+        thumbnail_content, _, _ = _thumbnail_from_image(image, thumbnail_size, quality)
+
+    return specs, thumbnail_content
+
+def probe_image_specs(file_path: str, mime_type: str) -> Dict[str, Any]:
+    """
+    只解析文件头获取图片尺寸，不经过PIL解码（无需生成缩略图时使用）
+
+    格式取自MIME类型；imagesize未安装时回退到PIL的惰性打开
+
+    Args:
+        file_path: 图片文件路径
+        mime_type: MIME类型
+
+    Returns:
+        技术规格，无法识别时为空字典
+    """
+    if IMAGESIZE_AVAILABLE:
+        width, height = imagesize.get(file_path)
+    else:
+        with Image.open(file_path) as image:
+            width, height = image.size
+
+    if width < 0 or height < 0:
+        return {}
+
+    return {
+        "width": width,
+        "height": height,
+        "format": mime_type.split("/", 1)[-1].upper()
+    }
+
 class FileStorageService:
     """文件存储服务类"""
 
@@ -107,6 +209,125 @@ async def upload_file(
             logger.error(f"文件上传失败: {str(e)}")
             raise ValidationError(f"文件上传失败: {str(e)}")
 
+    async def upload_file_from_path(
+        self,
+        source_path: str,
+        file_path: str,
+        content_type: str = "application/octet-stream",
+        metadata: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """
+        从本地临时文件上传，避免将整个文件读入内存
+
+        Args:
+            source_path: 本地源文件路径（本地存储时会被移动）
+            file_path: 文件存储路径
+            content_type: 文件内容类型
+            metadata: 文件元数据
+
+        Returns:
+            上传结果信息
+        """
+        try:
+            if self.use_oss:
+                return await self._upload_path_to_oss(source_path, file_path, content_type, metadata)
+            else:
+                return await self._upload_path_to_local(source_path, file_path, content_type)
+        except Exception as e:
+            logger.error(f"文件上传失败: {str(e)}")
+            raise ValidationError(f"文件上传失败: {str(e)}")
+
+    async def _upload_path_to_oss(
+        self,
+        source_path: str,
+        file_path: str,
+        content_type: str,
+        metadata: Optional[Dict[str, str]] = None
+    ) -> Dict[str, Any]:
+        """从本地文件上传到阿里云OSS"""
+        try:
+            headers = {
+                'Content-Type': content_type,
+                'Cache-Control': 'max-age=31536000',  # 缓存1年
+            }
+
+            if metadata:
+                for key, value in metadata.items():
+                    headers[f'x-oss-meta-{key}'] = value
+
+            # 大文件使用分片并发上传；SDK调用为同步阻塞，放到线程中执行
+            file_size = os.path.getsize(source_path)
+            if file_size >= OSS_MULTIPART_THRESHOLD:
+                result = await asyncio.to_thread(
+                    oss2.resumable_upload,
+                    self.oss_bucket,
+                    file_path,
+                    source_path,
+                    headers=headers,
+                    multipart_threshold=OSS_MULTIPART_THRESHOLD,
+                    part_size=OSS_MULTIPART_PART_SIZE,
+                    num_threads=OSS_MULTIPART_THREADS
+                )
+            else:
+                result = await asyncio.to_thread(
+                    self.oss_bucket.put_object_from_file, file_path, source_path, headers=headers
+                )
+
+            if result.status == 200:
+                file_url = f"https://{settings.OSS_BUCKET}.oss-{settings.OSS_REGION}.aliyuncs.com/{file_path}"
+
+                logger.info(f"✅ 文件上传到OSS成功: {file_path}")
+
+                return {
+                    "url": file_url,
+                    "path": file_path,
+                    "size": file_size,
+                    "content_type": content_type,
+                    "uploaded_at": datetime.now().isoformat(),
+                    "storage_type": "oss"
+                }
+            else:
+                raise RuntimeError(f"OSS上传失败，状态码: {result.status}")
+
+        except Exception as e:
+            logger.error(f"阿里云OSS上传失败: {str(e)}")
+            raise
+
+    async def _upload_path_to_local(
+        self,
+        source_path: str,
+        file_path: str,
+        content_type: str
+    ) -> Dict[str, Any]:
+        """从本地文件移动到本地存储"""
+        try:
+            full_path = self.local_storage_path / file_path
+            full_path.parent.mkdir(parents=True, exist_ok=True)
+
+            file_size = os.path.getsize(source_path)
+
+            # 同一文件系统下为重命名；跨文件系统时会复制内容，放到线程中执行
+            await asyncio.to_thread(shutil.move, source_path, full_path)
+            # mkstemp 创建的临时文件权限为0600，恢复为常规文件权限，静态文件服务才能读取
+            os.chmod(full_path, 0o644)
+
+            file_url = f"/storage/{file_path}"
+
+            logger.info(f"✅ 文件上传到本地存储成功: {full_path}")
+
+            return {
+                "url": file_url,
+                "path": str(full_path),
+                "size": file_size,
+                "content_type": content_type,
+                "uploaded_at": datetime.now().isoformat(),
+                "storage_type": "local"
+            }
+
+        except Exception as e:
+            logger.error(f"本地文件上传失败: {str(e)}")
+            raise
+
     async def _upload_to_oss(
         self,
         file_content: bytes,
@@ -162,9 +383,9 @@ async def _upload_to_local(
             full_path = self.local_storage_path / file_path
             full_path.parent.mkdir(parents=True, exist_ok=True)
 
-            # 写入文件
-            with open(full_path, 'wb') as f:
-                f.write(file_content)
+            # 异步写入文件，避免阻塞事件循环
+            async with aiofiles.open(full_path, 'wb') as f:
+                await f.write(file_content)
 
             # 生成文件URL（这里需要配置Web服务器来提供文件访问）
             file_url = f"/storage/{file_path}"
@@ -266,20 +487,10 @@ async def generate_thumbnail(
             return {"url": None, "error": "PIL库未安装"}
 
         try:
-            # 打开图片
-            image = Image.open(io.BytesIO(file_content))
-
-            # 转换为RGB模式（如果是RGBA等模式）
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-
-            # 生成缩略图
-            image.thumbnail(size, Image.Resampling.LANCZOS)
-
-            # 保存缩略图到内存
-            thumbnail_buffer = io.BytesIO()
-            image.save(thumbnail_buffer, format='JPEG', quality=quality)
-            thumbnail_content = thumbnail_buffer.getvalue()
+            # 解码和缩放为CPU密集操作，放到线程中执行避免阻塞事件循环
+            thumbnail_content, width, height = await asyncio.to_thread(
+                _render_thumbnail, file_content, size, quality
+            )
 
             # 上传缩略图
             thumbnail_result = await self.upload_file(
@@ -294,8 +505,8 @@ async def generate_thumbnail(
                 "url": thumbnail_result["url"],
                 "path": thumbnail_path,
                 "size": len(thumbnail_content),
-                "width": image.width,
-                "height": image.height,
+                "width": width,
+                "height": height,
                 "generated_at": datetime.now().isoformat()
             }
 
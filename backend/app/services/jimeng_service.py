@@ -28,6 +28,8 @@ def __init__(self):
         self.secret_key = settings.VOLC_SECRET_KEY
         self.base_url = settings.JIMENG_BASE_URL
         self.timeout = 60.0
+        # 限制并发上游请求数，避免突发流量触发限流(429)
+        self._semaphore = asyncio.Semaphore(settings.JIMENG_CONCURRENCY)
 
         if not self.access_key or not self.secret_key:
             logger.warning("即梦大模型 API credentials not configured")
@@ -302,7 +304,7 @@ async def _call_jimeng_api(
 
         timeout = timeout or self.timeout
 
-        async with httpx.AsyncClient(timeout=timeout) as client:
+        async with self._semaphore, httpx.AsyncClient(timeout=timeout) as client:
             response = await client.post(
                 f"{self.base_url}{endpoint}",
                 headers=headers,
@@ -10,19 +10,59 @@
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Set, Union
 from uuid import uuid4
+from cachetools import TTLCache
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import bindparam, select, exists, and_, or_, func
 from sqlalchemy.orm import selectinload
 
 from app.core.database import (
     User, Role, Permission, UserRole, RolePermission,
     ResourcePermission, PermissionAuditLog,
-    PermissionResource, PermissionAction, RoleType
+    PermissionResource, PermissionAction, RoleType, redis_manager
 )
 from app.core.exceptions import ValidationError, NotFoundError, PermissionDeniedError
+from app.core.security import invalidate_cached_user_id
 
 logger = logging.getLogger(__name__)
 
+# Redis 用户权限集合：HASH 字段为 "resource:action"，_v 字段记录写入时的全局版本
+PERMISSION_SET_KEY = "user:{user_id}:perms"
+PERMISSION_SET_VERSION_KEY = "perms:version"
+_PERMISSION_SET_VERSION_FIELD = "_v"
+
+# 直接授权快速路径：用户自身角色上是否存在匹配的授权（不含继承）
+_DIRECT_GRANT_EXISTS = select(
+    exists().where(
+        and_(
+            UserRole.user_id == bindparam("user_id"),
+            UserRole.is_active == True,
+            or_(UserRole.expires_at.is_(None), UserRole.expires_at > bindparam("now")),
+            RolePermission.role_id == UserRole.role_id,
+            RolePermission.is_granted == True,
+            or_(RolePermission.expires_at.is_(None), RolePermission.expires_at > bindparam("now")),
+            Permission.id == RolePermission.permission_id,
+            Permission.resource == bindparam("resource"),
+            Permission.action == bindparam("action")
+        )
+    )
+)
+
+# 用户有效角色查询（权限检查热路径），模块加载时构建一次
+_SELECT_EFFECTIVE_USER_ROLES = (
+    select(UserRole)
+    .options(selectinload(UserRole.role))
+    .where(
+        and_(
+            UserRole.user_id == bindparam("user_id"),
+            UserRole.is_active == True,
+            or_(
+                UserRole.expires_at.is_(None),
+                UserRole.expires_at > bindparam("now")
+            )
+        )
+    )
+)
+
 
 class PermissionService:
     """权限服务类 - 核心权限管理逻辑"""
@@ -31,6 +71,31 @@ def __init__(self):
         self._permission_cache = {}
         self._role_cache = {}
         self._cache_ttl = 300  # 5分钟缓存
+        # 用户权限列表缓存: user_id -> {resource: permissions}
+        self._user_permission_cache: TTLCache = TTLCache(maxsize=10_000, ttl=self._cache_ttl)
+
+    async def invalidate_user_permissions(self, user_id: Optional[str] = None):
+        """
+        失效用户权限缓存（进程内权限列表与 Redis 权限集合）
+
+        指定 user_id 时仅清除该用户；角色或权限定义变更会影响多个用户，不传则全部清除
+        （Redis 中通过递增全局版本号使所有权限集合失效）
+        """
+        if user_id is None:
+            self._user_permission_cache.clear()
+        else:
+            self._user_permission_cache.pop(user_id, None)
+
+        if not redis_manager.is_available:
+            return
+        try:
+            client = redis_manager.get_client()
+            if user_id is None:
+                await client.incr(PERMISSION_SET_VERSION_KEY)
+            else:
+                await client.delete(PERMISSION_SET_KEY.format(user_id=user_id))
+        except Exception as e:
+            logger.warning(f"Redis权限缓存失效失败: {str(e)}")
 
     async def create_permission(
         self,
@@ -184,15 +249,15 @@ async def assign_permission_to_role(
                 raise NotFoundError("权限", permission_id)
 
             # 检查是否已存在
-            existing = await db.execute(
-                select(RolePermission).where(
+            existing = await db.scalar(
+                select(exists().where(
                     and_(
                         RolePermission.role_id == role_id,
                         RolePermission.permission_id == permission_id
                     )
-                )
+                ))
             )
-            if existing.scalar_one_or_none():
+            if existing:
                 raise ValidationError("该角色已拥有此权限")
 
             role_permission = RolePermission(
@@ -202,12 +267,14 @@ async def assign_permission_to_role(
                 scope=scope,
                 conditions=conditions or {},
                 is_granted=is_granted,
-                expires_at=expires_at
+                expires_at=expires_at,
+                # 直接挂上已加载的权限对象，调用方无需再刷新关系
+                permission=permission
             )
 
             db.add(role_permission)
             await db.commit()
-            await db.refresh(role_permission)
+            await self.invalidate_user_permissions()
 
             logger.info(f"✅ 权限分配成功: 角色 {role.name} -> 权限 {permission.name}")
             return role_permission
@@ -251,16 +318,16 @@ async def assign_role_to_user(
                 raise NotFoundError("角色", role_id)
 
             # 检查是否已存在
-            existing = await db.execute(
-                select(UserRole).where(
+            existing = await db.scalar(
+                select(exists().where(
                     and_(
                         UserRole.user_id == user_id,
                         UserRole.role_id == role_id,
                         UserRole.is_active == True
                     )
-                )
+                ))
             )
-            if existing.scalar_one_or_none():
+            if existing:
                 raise ValidationError("该用户已拥有此角色")
 
             user_role = UserRole(
@@ -269,12 +336,15 @@ async def assign_role_to_user(
                 role_id=role_id,
                 assigned_by=assigned_by,
                 assignment_reason=assignment_reason,
-                expires_at=expires_at
+                expires_at=expires_at,
+                # 直接挂上已加载的角色对象，调用方无需再刷新关系
+                role=role
             )
 
             db.add(user_role)
             await db.commit()
-            await db.refresh(user_role)
+            await self.invalidate_user_permissions(user_id)
+            invalidate_cached_user_id(user_id)
 
             logger.info(f"✅ 角色分配成功: 用户 {user.username} -> 角色 {role.name}")
             return user_role
@@ -308,6 +378,30 @@ async def check_permission(
             是否有权限
         """
         try:
+            if not conditions:
+                # 无附加条件时先查 Redis 权限集合（单次 HMGET），
+                # Redis 不可用时退回直接授权 EXISTS 查询，命中即可跳过角色层级解析
+                has_role_perm = await self._lookup_permission_set(db, user_id, resource, action)
+                if has_role_perm is None:
+                    has_direct_perm = await db.scalar(
+                        _DIRECT_GRANT_EXISTS,
+                        {
+                            "user_id": user_id,
+                            "now": datetime.utcnow(),
+                            "resource": resource,
+                            "action": action
+                        }
+                    )
+                    if has_direct_perm:
+                        has_role_perm = True
+
+                # 未授予时仍需检查特定资源权限
+                if has_role_perm or (has_role_perm is False and not resource_id):
+                    await self._log_permission_check(
+                        db, user_id, resource, resource_id, action, has_role_perm
+                    )
+                    return has_role_perm
+
             # 获取用户所有角色
             user_roles = await self._get_user_roles(db, user_id)
             if not user_roles:
@@ -339,22 +433,201 @@ async def check_permission(
             logger.error(f"❌ 权限检查失败: {str(e)}")
             return False
 
-    async def _get_user_roles(self, db: AsyncSession, user_id: str) -> List[UserRole]:
-        """获取用户所有有效角色"""
+    async def check_permissions_bulk(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        checks: List[Dict[str, Any]]
+    ) -> List[bool]:
+        """
+        批量检查用户权限
+
+        角色层级与权限只解析一次，构建内存索引后逐项按字典查找，
+        避免逐个调用 check_permission 的重复查询。
+
+        Args:
+            db: 数据库会话
+            user_id: 用户ID
+            checks: 检查项列表，每项包含 resource、action，可选 resource_id、conditions
+
+        Returns:
+            与 checks 顺序一致的检查结果
+        """
+        try:
+            user_roles = await self._get_user_roles(db, user_id)
+            if not user_roles:
+                return [False] * len(checks)
+
+            role_ids = [ur.role_id for ur in user_roles]
+            all_role_ids = await self._get_role_hierarchy(db, role_ids)
+            now = datetime.utcnow()
+
+            # 角色权限索引: (resource, action) -> [conditions, ...]
+            result = await db.execute(
+                select(Permission.resource, Permission.action, RolePermission.conditions)
+                .join(RolePermission, RolePermission.permission_id == Permission.id)
+                .where(
+                    and_(
+                        RolePermission.role_id.in_(all_role_ids),
+                        RolePermission.is_granted == True,
+                        or_(
+                            RolePermission.expires_at.is_(None),
+                            RolePermission.expires_at > now
+                        )
+                    )
+                )
+            )
+            granted: Dict[tuple, List[Dict[str, Any]]] = {}
+            for perm_resource, perm_action, perm_conditions in result.all():
+                granted.setdefault((perm_resource, perm_action), []).append(perm_conditions or {})
+
+            # 资源特定权限索引: (resource, resource_id, action)
+            resource_grants: Set[tuple] = set()
+            resource_ids = {c["resource_id"] for c in checks if c.get("resource_id")}
+            if resource_ids:
+                result = await db.execute(
+                    select(
+                        ResourcePermission.resource_type,
+                        ResourcePermission.resource_id,
+                        Permission.action
+                    )
+                    .join(Permission, ResourcePermission.permission_id == Permission.id)
+                    .where(
+                        and_(
+                            ResourcePermission.resource_id.in_(resource_ids),
+                            or_(
+                                and_(
+                                    ResourcePermission.subject_type == "user",
+                                    ResourcePermission.subject_id == user_id
+                                ),
+                                and_(
+                                    ResourcePermission.subject_type == "role",
+                                    ResourcePermission.subject_id.in_(role_ids)
+                                )
+                            ),
+                            ResourcePermission.is_granted == True,
+                            or_(
+                                ResourcePermission.expires_at.is_(None),
+                                ResourcePermission.expires_at > now
+                            )
+                        )
+                    )
+                )
+                resource_grants = {tuple(row) for row in result.all()}
+
+            results = []
+            for check in checks:
+                resource = check["resource"]
+                action = check["action"]
+                resource_id = check.get("resource_id")
+                conditions = check.get("conditions")
+
+                if resource_id and (resource, resource_id, action) in resource_grants:
+                    results.append(True)
+                    continue
+
+                results.append(any(
+                    not (conditions and rp_conditions)
+                    or self._check_conditions(conditions, rp_conditions)
+                    for rp_conditions in granted.get((resource, action), ())
+                ))
+
+            return results
+
+        except Exception as e:
+            logger.error(f"❌ 批量权限检查失败: {str(e)}")
+            return [False] * len(checks)
+
+    async def _lookup_permission_set(
+        self,
+        db: AsyncSession,
+        user_id: str,
+        resource: PermissionResource,
+        action: PermissionAction
+    ) -> Optional[bool]:
+        """
+        从 Redis 权限集合判断角色权限（含继承），未命中时重建集合
+
+        Returns:
+            是否拥有角色权限；Redis 不可用时返回 None
+        """
+        if not redis_manager.is_available:
+            return None
+
+        key = PERMISSION_SET_KEY.format(user_id=user_id)
+        field = f"{resource.value}:{action.value}"
+        try:
+            client = redis_manager.get_client()
+            async with client.pipeline(transaction=False) as pipe:
+                pipe.hmget(key, _PERMISSION_SET_VERSION_FIELD, field)
+                pipe.get(PERMISSION_SET_VERSION_KEY)
+                (cached_version, granted), version = await pipe.execute()
+
+            version = version or "0"
+            if cached_version == version:
+                return granted is not None
+
+            permission_set, ttl = await self._build_permission_set(db, user_id)
+            mapping = {_PERMISSION_SET_VERSION_FIELD: version}
+            mapping.update((f"{r.value}:{a.value}", "1") for r, a in permission_set)
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.hset(key, mapping=mapping)
+                pipe.expire(key, ttl)
+                await pipe.execute()
+
+            return (resource, action) in permission_set
+
+        except Exception as e:
+            logger.warning(f"Redis权限集合读取失败: {str(e)}")
+            return None
+
+    async def _build_permission_set(self, db: AsyncSession, user_id: str):
+        """
+        计算用户通过角色（含继承）获得的 (resource, action) 集合
+
+        Returns:
+            (权限集合, 缓存秒数)；缓存时间不超过最早到期的角色或授权
+        """
+        now = datetime.utcnow()
+        user_roles = await self._get_user_roles(db, user_id)
+        if not user_roles:
+            return set(), self._cache_ttl
+
+        expiries = [ur.expires_at for ur in user_roles if ur.expires_at]
+        all_role_ids = await self._get_role_hierarchy(db, [ur.role_id for ur in user_roles])
+
         result = await db.execute(
-            select(UserRole)
-            .options(selectinload(UserRole.role))
+            select(Permission.resource, Permission.action, RolePermission.expires_at)
+            .join(RolePermission, RolePermission.permission_id == Permission.id)
             .where(
                 and_(
-                    UserRole.user_id == user_id,
-                    UserRole.is_active == True,
+                    RolePermission.role_id.in_(all_role_ids),
+                    RolePermission.is_granted == True,
                     or_(
-                        UserRole.expires_at.is_(None),
-                        UserRole.expires_at > datetime.utcnow()
+                        RolePermission.expires_at.is_(None),
+                        RolePermission.expires_at > now
                     )
                 )
             )
         )
+
+        permission_set = set()
+        for perm_resource, perm_action, expires_at in result.all():
+            permission_set.add((perm_resource, perm_action))
+            if expires_at:
+                expiries.append(expires_at)
+
+        ttl = self._cache_ttl
+        if expiries:
+            ttl = max(1, min(ttl, int((min(expiries) - now).total_seconds())))
+        return permission_set, ttl
+
+    async def _get_user_roles(self, db: AsyncSession, user_id: str) -> List[UserRole]:
+        """获取用户所有有效角色"""
+        result = await db.execute(
+            _SELECT_EFFECTIVE_USER_ROLES, {"user_id": user_id, "now": datetime.utcnow()}
+        )
         return result.scalars().all()
 
     async def _check_role_permission(
@@ -532,50 +805,71 @@ async def get_user_permissions(
             权限列表
         """
         try:
+            resource_key = resource.value if resource else None
+            cached = self._user_permission_cache.get(user_id)
+            if cached is not None and resource_key in cached:
+                return cached[resource_key]
+
             # 获取用户角色
             user_roles = await self._get_user_roles(db, user_id)
             if not user_roles:
-                return []
-
-            role_ids = [ur.role_id for ur in user_roles]
-            all_role_ids = await self._get_role_hierarchy(db, role_ids)
-
-            # 查询权限
-            query = select(RolePermission).options(
-                selectinload(RolePermission.permission),
-                selectinload(RolePermission.role)
-            ).where(
-                and_(
-                    RolePermission.role_id.in_(all_role_ids),
-                    RolePermission.is_granted == True,
-                    or_(
-                        RolePermission.expires_at.is_(None),
-                        RolePermission.expires_at > datetime.utcnow()
+                permissions = []
+            else:
+                role_ids = [ur.role_id for ur in user_roles]
+                all_role_ids = await self._get_role_hierarchy(db, role_ids)
+
+                # 单条 JOIN 查询取出权限与角色名，替代逐关系加载
+                query = select(
+                    RolePermission.permission_id,
+                    RolePermission.role_id,
+                    RolePermission.scope,
+                    RolePermission.conditions,
+                    RolePermission.expires_at,
+                    Permission.name,
+                    Permission.name_zh,
+                    Permission.resource,
+                    Permission.action,
+                    Role.name.label("role_name")
+                ).join(
+                    Permission, RolePermission.permission_id == Permission.id
+                ).join(
+                    Role, RolePermission.role_id == Role.id
+                ).where(
+                    and_(
+                        RolePermission.role_id.in_(all_role_ids),
+                        RolePermission.is_granted == True,
+                        or_(
+                            RolePermission.expires_at.is_(None),
+                            RolePermission.expires_at > datetime.utcnow()
+                        )
                     )
                 )
-            )
 
-            if resource:
-                query = query.join(Permission).where(Permission.resource == resource)
-
-            result = await db.execute(query)
-            role_permissions = result.scalars().all()
-
-            # 转换为标准格式
-            permissions = []
-            for rp in role_permissions:
-                permissions.append({
-                    "permission_id": rp.permission_id,
-                    "permission_name": rp.permission.name,
-                    "permission_name_zh": rp.permission.name_zh,
-                    "resource": rp.permission.resource.value,
-                    "action": rp.permission.action.value,
-                    "role_id": rp.role_id,
-                    "role_name": rp.role.name,
-                    "scope": rp.scope,
-                    "conditions": rp.conditions,
-                    "expires_at": rp.expires_at.isoformat() if rp.expires_at else None
-                })
+                if resource:
+                    query = query.where(Permission.resource == resource)
+
+                result = await db.execute(query)
+
+                # 转换为标准格式
+                permissions = [
+                    {
+                        "permission_id": row.permission_id,
+                        "permission_name": row.name,
+                        "permission_name_zh": row.name_zh,
+                        "resource": row.resource.value,
+                        "action": row.action.value,
+                        "role_id": row.role_id,
+                        "role_name": row.role_name,
+                        "scope": row.scope,
+                        "conditions": row.conditions,
+                        "expires_at": row.expires_at.isoformat() if row.expires_at else None
+                    }
+                    for row in result.all()
+                ]
+
+            if cached is None:
+                cached = self._user_permission_cache[user_id] = {}
+            cached[resource_key] = permissions
 
             return permissions
 
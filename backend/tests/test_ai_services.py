@@ -415,6 +415,46 @@ async def test_get_active_tasks(self, orchestrator):
             assert len(active_tasks) >= 3
             assert all(task["task_id"] in task_ids for task in active_tasks)
 
+    @pytest.mark.asyncio
+    async def test_get_task_statuses_bulk(self, orchestrator):
+        """测试批量获取任务状态"""
+        with patch.object(orchestrator, '_execute_concept_generation') as mock_execute:
+            mock_execute.return_value = {"test": "result"}
+
+            task_id = await orchestrator.create_task(
+                task_type=TaskType.CONCEPT_GENERATION,
+                project_id="test-project",
+                parameters={"test": "data"}
+            )
+
+            statuses = orchestrator.get_task_statuses([task_id, "missing-task"])
+
+            assert statuses[task_id]["task_id"] == task_id
+            assert statuses["missing-task"] is None
+
+    @pytest.mark.asyncio
+    async def test_get_active_tasks_by_project(self, orchestrator):
+        """测试按项目筛选活跃任务"""
+        with patch.object(orchestrator, '_execute_concept_generation') as mock_execute:
+            mock_execute.return_value = {"test": "result"}
+
+            task_a = await orchestrator.create_task(
+                task_type=TaskType.CONCEPT_GENERATION,
+                project_id="project-a",
+                parameters={"test": "data"}
+            )
+            await orchestrator.create_task(
+                task_type=TaskType.CONCEPT_GENERATION,
+                project_id="project-b",
+                parameters={"test": "data"}
+            )
+
+            tasks = orchestrator.get_active_tasks(project_id="project-a")
+
+            assert [t["task_id"] for t in tasks] == [task_a]
+            assert orchestrator.count_active_tasks(project_id="project-a") == 1
+            assert orchestrator.count_active_tasks(project_id="missing") == 0
+
     @pytest.mark.asyncio
     async def test_task_error_handling(self, orchestrator):
         """测试任务错误处理"""
@@ -581,6 +581,101 @@ async def test_permission_audit_logging(self):
         assert len(audit_logs) > 0
         assert any(log.success == True for log in audit_logs)
 
+    async def test_check_permissions_bulk_matches_single_checks(self):
+        """测试批量权限检查与逐项 check_permission 结果一致（含资源授权与条件）"""
+        read_permission = await self._create_test_permission(
+            "test.bulk.read", "Test bulk read permission",
+            PermissionResource.PROJECT, PermissionAction.READ,
+            "测试批量读取权限", "测试批量读取权限描述"
+        )
+        update_permission = await self._create_test_permission(
+            "test.bulk.update", "Test bulk update permission",
+            PermissionResource.PROJECT, PermissionAction.UPDATE,
+            "测试批量更新权限", "测试批量更新权限描述"
+        )
+
+        role = await self._create_test_role(
+            "test_bulk_role", "Test bulk role",
+            "测试批量角色", "测试批量角色描述"
+        )
+
+        # 角色仅在组织条件满足时授予读取
+        await permission_service.assign_permission_to_role(
+            db=self.db,
+            role_id=role.id,
+            permission_id=read_permission.id,
+            conditions={"organization_id": "test_org_123"}
+        )
+        await permission_service.assign_role_to_user(
+            db=self.db,
+            user_id=self.test_user.id,
+            role_id=role.id
+        )
+
+        # 更新权限只通过特定资源授予
+        self.db.add(ResourcePermission(
+            id=str(uuid4()),
+            resource_type=PermissionResource.PROJECT,
+            resource_id="bulk_project_id",
+            permission_id=update_permission.id,
+            subject_type="user",
+            subject_id=self.test_user.id,
+            is_granted=True,
+            created_by=self.admin_user.id
+        ))
+        await self.db.commit()
+
+        checks = [
+            {"resource": PermissionResource.PROJECT, "action": PermissionAction.READ},
+            {"resource": PermissionResource.PROJECT, "action": PermissionAction.READ,
+             "conditions": {"organization_id": "test_org_123"}},
+            {"resource": PermissionResource.PROJECT, "action": PermissionAction.READ,
+             "conditions": {"organization_id": "different_org"}},
+            {"resource": PermissionResource.PROJECT, "action": PermissionAction.UPDATE},
+            {"resource": PermissionResource.PROJECT, "action": PermissionAction.UPDATE,
+             "resource_id": "bulk_project_id"},
+            {"resource": PermissionResource.PROJECT, "action": PermissionAction.UPDATE,
+             "resource_id": "other_project_id"},
+            {"resource": PermissionResource.PROJECT, "action": PermissionAction.DELETE,
+             "resource_id": "bulk_project_id"},
+        ]
+
+        bulk_results = await permission_service.check_permissions_bulk(
+            db=self.db,
+            user_id=self.test_user.id,
+            checks=checks
+        )
+        single_results = [
+            await permission_service.check_permission(
+                db=self.db,
+                user_id=self.test_user.id,
+                resource=check["resource"],
+                action=check["action"],
+                resource_id=check.get("resource_id"),
+                conditions=check.get("conditions")
+            )
+            for check in checks
+        ]
+
+        assert bulk_results == single_results
+        assert bulk_results == [True, True, False, False, True, False, False]
+
+    async def test_check_permissions_bulk_without_roles(self):
+        """测试无角色用户的批量权限检查全部拒绝"""
+        checks = [
+            {"resource": PermissionResource.PROJECT, "action": PermissionAction.READ},
+            {"resource": PermissionResource.PROJECT, "action": PermissionAction.UPDATE,
+             "resource_id": "bulk_project_id"},
+        ]
+
+        bulk_results = await permission_service.check_permissions_bulk(
+            db=self.db,
+            user_id=self.admin_user.id,
+            checks=checks
+        )
+
+        assert bulk_results == [False, False]
+
 
 @pytest.mark.asyncio
 async def test_permission_system():
@@ -603,6 +698,8 @@ async def test_permission_system():
     await test_instance.test_system_permissions_creation()
     await test_instance.test_system_roles_creation()
     await test_instance.test_permission_conditions()
+    await test_instance.test_check_permissions_bulk_matches_single_checks()
+    await test_instance.test_check_permissions_bulk_without_roles()
     await test_instance.test_permission_audit_logging()
 
     print("✅ 所有权限系统测试通过！")
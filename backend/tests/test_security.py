@@ -0,0 +1,276 @@
+"""
+认证缓存与登录限流测试
+Authentication Cache and Login Rate Limit Tests
+
+测试令牌认证缓存与已签发令牌缓存的失效路径，以及登录频率限制
+Tests invalidation paths of the token auth cache and the issued-token cache, and the login rate limit
+"""
+
+import time
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from fastapi import HTTPException
+
+from app.api.endpoints import auth
+from app.core import security
+from app.core.config import settings
+from app.core.exceptions import RateLimitError
+from app.models import User
+from app.core.security import (
+    create_access_token,
+    create_tokens_for_user,
+    get_current_user,
+    invalidate_cached_user,
+    invalidate_cached_user_id,
+    invalidate_issued_tokens,
+)
+
+
+def _make_user(user_id: str = "user-1", role: str = "creator", is_active: bool = True, **kwargs):
+    """构造未关联会话的用户对象"""
+    return User(
+        id=user_id,
+        role=role,
+        is_active=is_active,
+        username=kwargs.get("username", "tester"),
+        email=kwargs.get("email", "tester@example.com"),
+        hashed_password=kwargs.get("hashed_password", "hash-1"),
+        preferences=kwargs.get("preferences", {"language": "zh-CN"}),
+    )
+
+
+def _make_db(*users):
+    """每次 db.get 依次返回给定用户，db.merge 原样返回对象，模拟请求会话"""
+    db = AsyncMock()
+    db.get = AsyncMock(side_effect=list(users))
+    db.merge = AsyncMock(side_effect=lambda instance, load=True: instance)
+    return db
+
+
+@pytest.fixture(autouse=True)
+def clear_auth_caches():
+    """每个测试前后清空模块级缓存"""
+    security._user_cache.clear()
+    security._issued_token_cache.clear()
+    yield
+    security._user_cache.clear()
+    security._issued_token_cache.clear()
+
+
+class TestCurrentUserCache:
+    """get_current_user 缓存测试类"""
+
+    @pytest.mark.asyncio
+    async def test_cache_stores_column_snapshot_not_orm_user(self):
+        """测试缓存保存列快照而非ORM对象"""
+        token = create_access_token({"sub": "user-1"})
+        user = _make_user()
+        await get_current_user(token=token, db=_make_db(user))
+
+        entry = security._user_cache[security._token_cache_key(token)]
+        assert entry.user_id == "user-1"
+        assert entry.exp > time.time()
+        assert entry.columns["role"] == "creator"
+        assert entry.columns["is_active"] is True
+        assert not any(value is user for value in entry)
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_token_verification_and_user_query(self):
+        """测试命中缓存时既不验证令牌也不查询用户，用户并入当前会话"""
+        token = create_access_token({"sub": "user-1"})
+        await get_current_user(token=token, db=_make_db(_make_user(hashed_password="hash-1")))
+
+        db = _make_db()
+        with patch.object(security, "verify_token") as mock_verify:
+            user = await get_current_user(token=token, db=db)
+
+        mock_verify.assert_not_called()
+        db.get.assert_not_awaited()
+        db.merge.assert_awaited_once()
+        assert db.merge.await_args.kwargs == {"load": False}
+        assert (user.id, user.role, user.is_active) == ("user-1", "creator", True)
+        assert user.hashed_password == "hash-1"
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_returns_independent_copies(self):
+        """测试请求内修改JSON列不影响缓存快照"""
+        token = create_access_token({"sub": "user-1"})
+        first = await get_current_user(token=token, db=_make_db(_make_user()))
+        first.preferences["language"] = "en-US"
+
+        second = await get_current_user(token=token, db=_make_db())
+        second.preferences["language"] = "ja-JP"
+
+        third = await get_current_user(token=token, db=_make_db())
+        assert third.preferences["language"] == "zh-CN"
+
+    @pytest.mark.asyncio
+    async def test_inactive_user_not_cached(self):
+        """测试未激活用户被拒绝且不进入缓存"""
+        token = create_access_token({"sub": "user-1"})
+
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(token=token, db=_make_db(_make_user(is_active=False)))
+
+        assert exc_info.value.status_code == 400
+        assert security._token_cache_key(token) not in security._user_cache
+
+    @pytest.mark.asyncio
+    async def test_evicted_user_reloaded_with_current_state(self):
+        """测试清除缓存后重新查询，停用的用户被拒绝"""
+        token = create_access_token({"sub": "user-1"})
+        await get_current_user(token=token, db=_make_db(_make_user()))
+
+        invalidate_cached_user_id("user-1")
+
+        db = _make_db(_make_user(is_active=False))
+        with pytest.raises(HTTPException) as exc_info:
+            await get_current_user(token=token, db=db)
+
+        assert exc_info.value.status_code == 400
+        db.get.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_invalidate_cached_user_id_evicts_all_tokens(self):
+        """测试按用户ID清除该用户所有令牌的缓存条目"""
+        token_a = create_access_token({"sub": "user-1", "jti": "a"})
+        token_b = create_access_token({"sub": "user-1", "jti": "b"})
+        token_other = create_access_token({"sub": "user-2"})
+        await get_current_user(token=token_a, db=_make_db(_make_user()))
+        await get_current_user(token=token_b, db=_make_db(_make_user()))
+        await get_current_user(token=token_other, db=_make_db(_make_user("user-2")))
+
+        invalidate_cached_user_id("user-1")
+
+        assert security._token_cache_key(token_a) not in security._user_cache
+        assert security._token_cache_key(token_b) not in security._user_cache
+        assert security._token_cache_key(token_other) in security._user_cache
+
+    @pytest.mark.asyncio
+    async def test_invalidate_cached_user_forces_token_verification(self):
+        """测试登出后令牌重新走完整验证"""
+        token = create_access_token({"sub": "user-1"})
+        await get_current_user(token=token, db=_make_db(_make_user()))
+
+        invalidate_cached_user(token)
+
+        with patch.object(security, "verify_token", return_value=None):
+            with pytest.raises(HTTPException) as exc_info:
+                await get_current_user(token=token, db=_make_db(_make_user()))
+
+        assert exc_info.value.status_code == 401
+
+
+class TestIssuedTokenCache:
+    """create_tokens_for_user 缓存测试类"""
+
+    def test_cache_hit_reports_remaining_lifetime(self):
+        """测试命中缓存时 expires_in 按缓存令牌的剩余有效期计算"""
+        user = _make_user()
+        first = create_tokens_for_user(user)
+
+        with patch.object(security.time, "time", return_value=time.time() + 10):
+            second = create_tokens_for_user(user)
+
+        assert second["access_token"] == first["access_token"]
+        assert second["expires_in"] <= first["expires_in"] - 9
+
+    def test_invalidate_issued_tokens_reissues_with_current_claims(self):
+        """测试清除后重新签发的令牌携带最新的用户名/邮箱"""
+        create_tokens_for_user(_make_user(username="old_name"))
+
+        invalidate_issued_tokens("user-1")
+        tokens = create_tokens_for_user(_make_user(username="new_name"))
+
+        payload = security.verify_token(tokens["access_token"])
+        assert payload["username"] == "new_name"
+
+    def test_invalidate_issued_tokens_only_affects_user(self):
+        """测试清除只影响指定用户"""
+        create_tokens_for_user(_make_user("user-1"))
+        create_tokens_for_user(_make_user("user-2"))
+
+        invalidate_issued_tokens("user-1")
+
+        assert ("user-1", "creator") not in security._issued_token_cache
+        assert ("user-2", "creator") in security._issued_token_cache
+
+
+class _FakeRedis:
+    """只实现 INCR/EXPIRE 的内存Redis客户端"""
+
+    def __init__(self):
+        self.counters = {}
+        self.expire = AsyncMock()
+
+    async def incr(self, key):
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+
+def _redis_manager(client=None, available=True):
+    """构造替换 auth.redis_manager 的对象"""
+    manager = MagicMock()
+    manager.is_available = available
+    manager.get_client.return_value = client
+    return manager
+
+
+class TestLoginRateLimit:
+    """_check_login_rate 登录限流测试类"""
+
+    @pytest.mark.asyncio
+    async def test_rejects_after_limit_with_retry_after(self):
+        """测试超过 LOGIN_RATE_LIMIT 次后返回429并携带 Retry-After"""
+        client = _FakeRedis()
+        with patch.object(auth, "redis_manager", _redis_manager(client)):
+            for _ in range(settings.LOGIN_RATE_LIMIT):
+                await auth._check_login_rate("10.0.0.1", "tester@example.com")
+
+            with pytest.raises(RateLimitError) as exc_info:
+                await auth._check_login_rate("10.0.0.1", "tester@example.com")
+
+        assert exc_info.value.status_code == 429
+        assert exc_info.value.headers["Retry-After"] == str(settings.LOGIN_RATE_LIMIT_WINDOW)
+
+    @pytest.mark.asyncio
+    async def test_window_expiry_set_on_first_attempt_only(self):
+        """测试仅在首次计数时设置窗口过期时间"""
+        client = _FakeRedis()
+        with patch.object(auth, "redis_manager", _redis_manager(client)):
+            for _ in range(3):
+                await auth._check_login_rate("10.0.0.1", "tester@example.com")
+
+        client.expire.assert_awaited_once_with(
+            "auth:login:10.0.0.1:tester@example.com", settings.LOGIN_RATE_LIMIT_WINDOW
+        )
+
+    @pytest.mark.asyncio
+    async def test_limit_is_per_ip_and_identifier(self):
+        """测试限流按 (IP, 登录账号) 分别计数"""
+        client = _FakeRedis()
+        with patch.object(auth, "redis_manager", _redis_manager(client)):
+            for _ in range(settings.LOGIN_RATE_LIMIT):
+                await auth._check_login_rate("10.0.0.1", "tester@example.com")
+
+            await auth._check_login_rate("10.0.0.1", "other@example.com")
+            await auth._check_login_rate("10.0.0.2", "tester@example.com")
+
+    @pytest.mark.asyncio
+    async def test_skipped_when_redis_unavailable(self):
+        """测试Redis不可用时不限流"""
+        manager = _redis_manager(available=False)
+        with patch.object(auth, "redis_manager", manager):
+            for _ in range(settings.LOGIN_RATE_LIMIT + 1):
+                await auth._check_login_rate("10.0.0.1", "tester@example.com")
+
+        manager.get_client.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_fails_open_on_redis_error(self):
+        """测试Redis命令出错时放行"""
+        client = _FakeRedis()
+        client.incr = AsyncMock(side_effect=ConnectionError("redis down"))
+        with patch.object(auth, "redis_manager", _redis_manager(client)):
+            for _ in range(settings.LOGIN_RATE_LIMIT + 1):
+                await auth._check_login_rate("10.0.0.1", "tester@example.com")